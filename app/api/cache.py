@@ -0,0 +1,152 @@
+"""In-process response cache for read-mostly routes.
+
+Entries are keyed by route + query parameters and tagged with the data
+generation (see ``app.db.generation``) they were built from.  A lookup with a
+different generation is a miss, so an ETL commit in any process invalidates
+every cached response without the API having to track what changed.  Memory
+is bounded by entry count and approximate serialized size, with LRU eviction,
+and entries also expire after a TTL.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.generation import local_version, read_generation
+
+
+@dataclass
+class CacheEntry:
+    generation: Hashable
+    expires_at: float
+    body: Any
+    etag: str
+    size: int
+
+
+def make_entry(generation: Hashable, body: Any, ttl_seconds: float = 0) -> CacheEntry:
+    encoded = json.dumps(body, separators=(",", ":"), sort_keys=True).encode()
+    etag = 'W/"' + hashlib.sha1(encoded).hexdigest() + '"'
+    return CacheEntry(generation, time.monotonic() + ttl_seconds, body, etag, len(encoded))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: Hashable) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != generation or entry.expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, generation: Hashable, body: Any) -> CacheEntry:
+        entry = make_entry(generation, body, self.ttl_seconds)
+        if entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> ResponseCache:
+    """The process-wide cache, sized from settings on first use."""
+    return ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        max_bytes=settings.response_cache_max_bytes,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
+
+
+_generation_lock = threading.Lock()
+_generation_memo: tuple[float, int, Hashable] | None = None
+
+
+def current_generation(db: Session) -> Hashable:
+    """Return the data generation, re-reading the table at most once per poll interval."""
+    global _generation_memo
+    now = time.monotonic()
+    with _generation_lock:
+        memo = _generation_memo
+    if memo is not None and memo[0] > now and memo[1] == local_version():
+        return memo[2]
+    generation = read_generation(db)
+    with _generation_lock:
+        _generation_memo = (now + settings.response_cache_generation_poll_seconds, local_version(), generation)
+    return generation
+
+
+def reset() -> None:
+    global _generation_memo
+    get_response_cache.cache_clear()
+    with _generation_lock:
+        _generation_memo = None
+
+
+def cached_body(db: Session, key: Hashable, build: Callable[[], Any]) -> CacheEntry:
+    """Return the cache entry for ``key``, building (and storing) it on a miss."""
+    generation = current_generation(db)
+    if settings.response_cache_enabled:
+        response_cache = get_response_cache()
+        entry = response_cache.get(key, generation)
+        if entry is not None:
+            return entry
+        return response_cache.set(key, generation, jsonable_encoder(build()))
+    return make_entry(generation, jsonable_encoder(build()))
+
+
+def request_key(request: Request) -> tuple[str, tuple[tuple[str, str], ...]]:
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def not_modified(request: Request, entry: CacheEntry) -> Response | None:
+    """Return a 304 response when the client already holds ``entry``."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = {tag.strip() for tag in header.split(",")}
+    if entry.etag in tags or "*" in tags:
+        return Response(status_code=304, headers=cache_headers(entry))
+    return None
+
+
+def cache_headers(entry: CacheEntry) -> dict[str, str]:
+    return {"ETag": entry.etag, "Cache-Control": "no-cache"}
@@ -4,14 +4,16 @@ from contextlib import contextmanager
 
 from fastapi import Request
 
+from app.api.metrics import REQUEST_LATENCY
+
 
 @contextmanager
-def latency_tracker():
+def latency_tracker(route: str = "unknown"):
     start = time.perf_counter()
     try:
         yield lambda: (time.perf_counter() - start) * 1000
     finally:
-        ...
+        REQUEST_LATENCY.observe(time.perf_counter() - start, route)
 
 
 def get_request_meta():
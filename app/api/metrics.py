@@ -0,0 +1,69 @@
+"""Minimal Prometheus text-format metrics (no client library dependency)."""
+import bisect
+import threading
+from collections.abc import Iterable, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label_values, (counts, total, value_sum) in sorted(series.items()):
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': repr(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': '+Inf'})} {total}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {value_sum}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {total}")
+        return lines
+
+
+def render_gauges(name: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines += [f"{name}{format_labels(labels)} {value}" for labels, value in samples]
+    return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Latency of API route handlers",
+    ("route",),
+)
@@ -0,0 +1,94 @@
+import base64
+import json
+from typing import Any, Literal
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+TotalMode = Literal["exact", "approx", "none"]
+
+
+def encode_token(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(cursor: str) -> dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def encode_cursor(last_id: int, source: str | None) -> str:
+    return encode_token({"id": last_id, "source": source})
+
+
+def decode_cursor(cursor: str, source: str | None) -> int:
+    """Return the last seen id encoded in ``cursor``.
+
+    The cursor is bound to the ``source`` filter it was issued for, so reusing
+    it with a different filter is rejected instead of silently skipping rows.
+    """
+    payload = decode_token(cursor)
+    try:
+        last_id = int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("source") != source:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different source filter")
+    return last_id
+
+
+def _postgres_estimate(db: Session, source: str | None) -> int | None:
+    if source is None:
+        row = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'unified_records'::regclass")
+        ).first()
+        if row is not None and row[0] >= 0:
+            return int(row[0])
+        return None
+    plan = db.execute(
+        text("EXPLAIN (FORMAT JSON) SELECT 1 FROM unified_records WHERE source = :source"),
+        {"source": source},
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_records(db: Session, source: str | None, mode: TotalMode) -> tuple[int | None, bool]:
+    """Return ``(total, is_estimate)`` for the unified records matching ``source``.
+
+    ``approx`` reads planner statistics on PostgreSQL instead of scanning the
+    table; dialects without usable statistics fall back to an exact count.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "approx" and db.get_bind().dialect.name == "postgresql":
+        estimate = _postgres_estimate(db, source)
+        if estimate is not None:
+            return estimate, True
+
+    stmt = select(func.count()).select_from(models.UnifiedRecord)
+    if source:
+        stmt = stmt.where(models.UnifiedRecord.source == source)
+    return db.execute(stmt).scalar_one(), False
+
+
+def serialize_record(item: Any) -> dict[str, Any]:
+    return {
+        "id": item.id,
+        "source": item.source,
+        "external_id": item.external_id,
+        "name": item.name,
+        "value": item.value,
+        "timestamp": item.timestamp,
+    }
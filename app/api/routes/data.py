@@ -1,58 +1,119 @@
-from typing import Any
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from app.api.cache import CacheEntry, cache_headers, cached_body, not_modified, request_key
 from app.api.deps import latency_tracker, get_request_meta
-from app.db.session import get_db
+from app.api.pagination import TotalMode, count_records, decode_cursor, encode_cursor, serialize_record
+from app.db.session import get_async_db, get_db
 from app.db import models
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 router = APIRouter(tags=["data"])
+async_router = APIRouter(tags=["data"])
 
 
-@router.get("/data")
-def get_data(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=100),
-    source: str | None = Query(None),
-    db: Session = Depends(get_db),
-) -> dict[str, Any]:
-    with latency_tracker() as latency:
-        request_id = get_request_meta()
+@dataclass
+class DataQuery:
+    page: int = Query(1, ge=1)
+    page_size: int = Query(10, ge=1, le=100)
+    source: str | None = Query(None)
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="'cursor' pages by id (keyset) instead of OFFSET"
+    )
+    cursor: str | None = Query(None, description="next_cursor from a previous response; implies pagination=cursor")
+    total: TotalMode | None = Query(
+        None, description="exact / approx / none; defaults to exact for page mode and none for cursor mode"
+    )
+
 
-        query = db.query(models.UnifiedRecord)
-        if source:
-            query = query.filter(models.UnifiedRecord.source == source.lower())
+def build_data_body(db: Session, params: DataQuery) -> dict[str, Any]:
+    source = params.source.lower() if params.source else None
+    page_size = params.page_size
 
-        total = query.count()
+    query = db.query(models.UnifiedRecord)
+    if source:
+        query = query.filter(models.UnifiedRecord.source == source)
+
+    if params.cursor is not None or params.pagination == "cursor":
+        # Keyset on (source, id) when filtered, (id) otherwise: the index
+        # seek cost does not depend on how deep the client has paged.
+        if params.cursor:
+            query = query.filter(models.UnifiedRecord.id > decode_cursor(params.cursor, source))
+        items = query.order_by(models.UnifiedRecord.id).limit(page_size + 1).all()
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        count, estimated = count_records(db, source, params.total or "none")
+        page_info = {
+            "mode": "cursor",
+            "page_size": page_size,
+            "next_cursor": encode_cursor(items[-1].id, source) if has_more else None,
+            "total": count,
+            "total_is_estimate": estimated,
+        }
+    else:
+        count, estimated = count_records(db, source, params.total or "exact")
         items = (
             query.order_by(models.UnifiedRecord.id)
-            .offset((page - 1) * page_size)
+            .offset((params.page - 1) * page_size)
             .limit(page_size)
             .all()
         )
+        page_info = {
+            "page": params.page,
+            "page_size": page_size,
+            "total": count,
+        }
+        if estimated:
+            page_info["total_is_estimate"] = True
 
-        data = [
-            {
-                "id": item.id,
-                "source": item.source,
-                "external_id": item.external_id,
-                "name": item.name,
-                "value": item.value,
-                "timestamp": item.timestamp,
-            }
-            for item in items
-        ]
-
-        return {
-            "data": data,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-            },
+    return {
+        "data": [serialize_record(item) for item in items],
+        "pagination": page_info,
+    }
+
+
+def _data_response(request: Request, entry: CacheEntry, request_id: str, latency) -> Response:
+    if (response := not_modified(request, entry)) is not None:
+        return response
+    return JSONResponse(
+        {
+            **entry.body,
             "meta": {
                 "request_id": request_id,
                 "api_latency_ms": latency(),
             },
-        }
+        },
+        headers=cache_headers(entry),
+    )
+
+
+@router.get("/data")
+def get_data(
+    request: Request,
+    params: DataQuery = Depends(),
+    db: Session = Depends(get_db),
+) -> Response:
+    with latency_tracker("/data") as latency:
+        request_id = get_request_meta()
+        entry = cached_body(db, request_key(request), lambda: build_data_body(db, params))
+        return _data_response(request, entry, request_id, latency)
+
+
+@async_router.get("/data")
+async def get_data_async(
+    request: Request,
+    params: DataQuery = Depends(),
+    db: "AsyncSession" = Depends(get_async_db),
+) -> Response:
+    with latency_tracker("/data") as latency:
+        request_id = get_request_meta()
+        entry = await db.run_sync(
+            lambda sync_db: cached_body(sync_db, request_key(request), lambda: build_data_body(sync_db, params))
+        )
+        return _data_response(request, entry, request_id, latency)
@@ -0,0 +1,191 @@
+"""Bulk export of ``unified_records`` as streamed NDJSON or CSV.
+
+Rows come straight from a server-side cursor (``stream_results`` /
+``yield_per``) as plain column tuples and are encoded one partition at a
+time, so memory stays flat however large the export is and there is no
+OFFSET or ``count()`` per page.  When the client accepts gzip the stream is
+compressed incrementally.  Responses are not cached, and the latency metric
+is recorded once the stream has been sent, not when the response is built.
+"""
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal
+import csv
+import io
+import json
+import time
+import zlib
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.api.metrics import REQUEST_LATENCY
+from app.core.config import settings
+from app.db.session import get_async_db, get_db
+from app.db import models
+from app.db.types import naive_utc
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+router = APIRouter(tags=["data"])
+async_router = APIRouter(tags=["data"])
+
+ROUTE = "/data/export"
+EXPORT_COLUMNS = ("id", "source", "external_id", "name", "value", "timestamp")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@dataclass
+class ExportQuery:
+    format: Literal["ndjson", "csv"] = Query("ndjson")
+    source: str | None = Query(None)
+    start: datetime | None = Query(None, description="Inclusive lower bound on timestamp")
+    end: datetime | None = Query(None, description="Exclusive upper bound on timestamp")
+
+
+def build_export_statement(params: ExportQuery) -> Select:
+    table = models.UnifiedRecord.__table__
+    stmt = select(*(table.c[name] for name in EXPORT_COLUMNS))
+    if params.source:
+        stmt = stmt.where(table.c.source == params.source.lower())
+    if params.start is not None:
+        stmt = stmt.where(table.c.timestamp >= naive_utc(params.start))
+    if params.end is not None:
+        stmt = stmt.where(table.c.timestamp < naive_utc(params.end))
+    if params.start is not None or params.end is not None:
+        # Walk ix_unified_records_source_timestamp (or, without a source,
+        # ix_unified_records_timestamp_id) rather than sorting the window.
+        return stmt.order_by(table.c.timestamp, table.c.id)
+    return stmt.order_by(table.c.id)
+
+
+def _row_values(row: Iterable[Any]) -> list[Any]:
+    values = list(row)
+    ts = values[-1]
+    values[-1] = ts.isoformat() if ts is not None else None
+    return values
+
+
+def _csv_lines(rows: Iterable[Iterable[Any]]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode()
+
+
+def encode_rows(rows: Iterable[Iterable[Any]], fmt: str) -> bytes:
+    if fmt == "csv":
+        return _csv_lines(_row_values(row) for row in rows)
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row))), separators=(",", ":")) + "\n" for row in rows
+    ).encode()
+
+
+def _header(fmt: str) -> bytes:
+    return _csv_lines([EXPORT_COLUMNS]) if fmt == "csv" else b""
+
+
+def accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if coding.lower() in ("gzip", "*"):
+            q = next((param[2:] for param in params if param.startswith("q=")), "1")
+            try:
+                return float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+class _Encoder:
+    def __init__(self, fmt: str, gzip: bool):
+        self.fmt = fmt
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+
+    def _out(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) if self.compressor else data
+
+    def header(self) -> bytes:
+        return self._out(_header(self.fmt))
+
+    def rows(self, rows) -> bytes:
+        return self._out(encode_rows(rows, self.fmt))
+
+    def finish(self) -> bytes:
+        return self.compressor.flush() if self.compressor else b""
+
+
+def iter_export(engine: Engine, stmt: Select, fmt: str, gzip: bool) -> Iterator[bytes]:
+    encoder = _Encoder(fmt, gzip)
+    if chunk := encoder.header():
+        yield chunk
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=settings.export_batch_size).execute(stmt)
+        for rows in result.partitions():
+            if chunk := encoder.rows(rows):
+                yield chunk
+    if chunk := encoder.finish():
+        yield chunk
+
+
+async def aiter_export(engine: "AsyncEngine", stmt: Select, fmt: str, gzip: bool) -> AsyncIterator[bytes]:
+    encoder = _Encoder(fmt, gzip)
+    if chunk := encoder.header():
+        yield chunk
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=settings.export_batch_size))
+        async for rows in result.partitions():
+            if chunk := encoder.rows(rows):
+                yield chunk
+    if chunk := encoder.finish():
+        yield chunk
+
+
+def _timed(body: Iterator[bytes], started: float) -> Iterator[bytes]:
+    try:
+        yield from body
+    finally:
+        REQUEST_LATENCY.observe(time.perf_counter() - started, ROUTE)
+
+
+async def _atimed(body: AsyncIterator[bytes], started: float) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        REQUEST_LATENCY.observe(time.perf_counter() - started, ROUTE)
+
+
+def _export_response(body, params: ExportQuery, gzip: bool) -> StreamingResponse:
+    headers = {
+        "Content-Disposition": f'attachment; filename="unified_records.{params.format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[params.format], headers=headers)
+
+
+@router.get("/data/export")
+def export_data(request: Request, params: ExportQuery = Depends(), db: Session = Depends(get_db)) -> StreamingResponse:
+    started = time.perf_counter()
+    gzip = accepts_gzip(request)
+    stmt = build_export_statement(params)
+    # The stream outlives the request's session, so it takes its own connection.
+    body = iter_export(db.get_bind(), stmt, params.format, gzip)
+    return _export_response(_timed(body, started), params, gzip)
+
+
+@async_router.get("/data/export")
+async def export_data_async(
+    request: Request, params: ExportQuery = Depends(), db: "AsyncSession" = Depends(get_async_db)
+) -> StreamingResponse:
+    started = time.perf_counter()
+    gzip = accepts_gzip(request)
+    stmt = build_export_statement(params)
+    body = aiter_export(db.bind, stmt, params.format, gzip)
+    return _export_response(_atimed(body, started), params, gzip)
@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.metrics import REQUEST_LATENCY, render_gauges
+from app.db.session import get_async_db, get_db
+from app.db import models
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(tags=["metrics"])
+async_router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_METRICS = (
+    ("wall_seconds", "etl_stage_wall_seconds", "Wall time of the stage in the latest finished run"),
+    ("rows", "etl_stage_rows", "Rows handled by the stage in the latest finished run"),
+    ("rows_per_second", "etl_stage_rows_per_second", "Stage throughput in the latest finished run"),
+    ("bytes_read", "etl_stage_bytes_read", "Bytes read by the stage in the latest finished run"),
+    ("statements", "etl_stage_db_statements", "SQL statements issued by the stage in the latest finished run"),
+)
+
+SOURCE_METRICS = (
+    ("total_runs", "etl_source_runs_total", "ETL runs started per source"),
+    ("total_processed", "etl_source_records_processed_total", "Records processed per source"),
+    ("last_duration_seconds", "etl_source_last_duration_seconds", "Duration of the last finished run"),
+)
+
+
+def _etl_lines(db: Session) -> list[str]:
+    latest = (
+        select(models.EtlRun.source, func.max(models.EtlRun.id).label("run_id"))
+        .where(models.EtlRun.finished_at.isnot(None))
+        .group_by(models.EtlRun.source)
+        .subquery()
+    )
+    stages = db.execute(
+        select(latest.c.source, models.EtlRunStage)
+        .join(models.EtlRunStage, models.EtlRunStage.run_id == latest.c.run_id)
+        .order_by(latest.c.source, models.EtlRunStage.stage)
+    ).all()
+    sources = db.query(models.EtlSourceStats).order_by(models.EtlSourceStats.source).all()
+
+    lines: list[str] = []
+    for attr, name, help_text in STAGE_METRICS:
+        lines += render_gauges(
+            name,
+            help_text,
+            (({"source": src, "stage": st.stage}, getattr(st, attr)) for src, st in stages),
+        )
+    for attr, name, help_text in SOURCE_METRICS:
+        lines += render_gauges(
+            name,
+            help_text,
+            (({"source": row.source}, getattr(row, attr)) for row in sources if getattr(row, attr) is not None),
+        )
+    return lines
+
+
+def render_metrics(db: Session) -> str:
+    lines = REQUEST_LATENCY.render()
+    try:
+        lines += _etl_lines(db)
+    except Exception:  # noqa: BLE001
+        # Request metrics are still useful while the database is down.
+        pass
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics")
+def metrics(db: Session = Depends(get_db)) -> Response:
+    return Response(render_metrics(db), media_type=CONTENT_TYPE)
+
+
+@async_router.get("/metrics")
+async def metrics_async(db: "AsyncSession" = Depends(get_async_db)) -> Response:
+    return Response(await db.run_sync(render_metrics), media_type=CONTENT_TYPE)
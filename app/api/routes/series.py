@@ -0,0 +1,289 @@
+"""Latest-value and time-window reads over ``unified_records``.
+
+``unified_records`` holds one row per (source, external_id), kept current by
+``upsert_unified_records``, so it doubles as the latest-value table: latest
+lookups are point reads on ``uix_source_external`` and time windows are
+range scans on ``ix_unified_records_source_timestamp``.  Past values live in
+``unified_history`` and its OHLC rollups, read by ``/data/history`` and
+``/data/rollups`` as range scans on their unique keys.  All of them return
+at most ``limit`` rows with a keyset cursor, so cost follows the result size.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.api.cache import CacheEntry, cache_headers, cached_body, not_modified, request_key
+from app.api.deps import get_request_meta, latency_tracker
+from app.api.pagination import decode_token, encode_token, serialize_record
+from app.db.session import get_async_db, get_db
+from app.db import models
+from app.db.types import naive_utc
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(tags=["data"])
+async_router = APIRouter(tags=["data"])
+
+MAX_LIMIT = 1000
+
+
+@dataclass
+class RangeQuery:
+    source: str = Query(...)
+    start: datetime = Query(..., description="Inclusive lower bound on timestamp")
+    end: datetime = Query(..., description="Exclusive upper bound on timestamp")
+    external_id: str | None = Query(None)
+    limit: int = Query(100, ge=1, le=MAX_LIMIT)
+    cursor: str | None = Query(None)
+
+
+@dataclass
+class HistoryQuery:
+    source: str = Query(...)
+    external_id: str = Query(...)
+    start: datetime = Query(..., description="Inclusive lower bound on timestamp")
+    end: datetime = Query(..., description="Exclusive upper bound on timestamp")
+    limit: int = Query(100, ge=1, le=MAX_LIMIT)
+    cursor: str | None = Query(None)
+
+
+@dataclass
+class RollupQuery(HistoryQuery):
+    interval: Literal["1m", "1h", "1d"] = Query("1h", description="Bucket width")
+
+
+def build_latest_body(db: Session, source: str, external_ids: list[str], limit: int, cursor: str | None) -> dict[str, Any]:
+    source = source.lower()
+    table = models.UnifiedRecord
+    stmt = select(table).where(table.source == source)
+    if len(external_ids) > MAX_LIMIT:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_LIMIT} external_id values are allowed")
+    if external_ids:
+        stmt = stmt.where(table.external_id.in_(external_ids))
+    if cursor:
+        token = decode_token(cursor)
+        if token.get("source") != source:
+            raise HTTPException(status_code=400, detail="Cursor was issued for a different query")
+        try:
+            last_id = int(token["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(table.id > last_id)
+    items = db.execute(stmt.order_by(table.id).limit(limit + 1)).scalars().all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "data": [serialize_record(item) for item in items],
+        "next_cursor": encode_token({"source": source, "id": items[-1].id}) if has_more else None,
+    }
+
+
+def build_range_body(db: Session, params: RangeQuery) -> dict[str, Any]:
+    source = params.source.lower()
+    start, end = naive_utc(params.start), naive_utc(params.end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+
+    # The cursor is bound to the filters it was issued for, so it cannot be
+    # replayed against another source or window.
+    query = {"source": source, "external_id": params.external_id, "start": start.isoformat(), "end": end.isoformat()}
+    table = models.UnifiedRecord
+    stmt = select(table).where(table.source == source, table.timestamp >= start, table.timestamp < end)
+    if params.external_id:
+        stmt = stmt.where(table.external_id == params.external_id)
+    if params.cursor:
+        token = decode_token(params.cursor)
+        if token.get("query") != query:
+            raise HTTPException(status_code=400, detail="Cursor was issued for a different query")
+        try:
+            last_ts, last_id = datetime.fromisoformat(token["timestamp"]), int(token["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(
+            or_(table.timestamp > last_ts, and_(table.timestamp == last_ts, table.id > last_id))
+        )
+    items = db.execute(stmt.order_by(table.timestamp, table.id).limit(params.limit + 1)).scalars().all()
+    has_more = len(items) > params.limit
+    items = items[: params.limit]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_token({"query": query, "timestamp": naive_utc(last.timestamp).isoformat(), "id": last.id})
+    return {
+        "data": [serialize_record(item) for item in items],
+        "next_cursor": next_cursor,
+    }
+
+
+def _window(params: HistoryQuery) -> tuple[datetime, datetime]:
+    start, end = naive_utc(params.start), naive_utc(params.end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if params.cursor:
+        try:
+            start = datetime.fromisoformat(decode_token(params.cursor)["after"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return start, end
+
+
+def _series_page(db: Session, stmt, column, params: HistoryQuery, serialize) -> dict[str, Any]:
+    """Page ``stmt`` on ``column``, unique within one (source, external_id)."""
+    start, end = _window(params)
+    op = column.__gt__ if params.cursor else column.__ge__
+    stmt = stmt.where(op(start), column < end).order_by(column).limit(params.limit + 1)
+    items = db.execute(stmt).scalars().all()
+    has_more = len(items) > params.limit
+    items = items[: params.limit]
+    next_cursor = None
+    if has_more:
+        last = naive_utc(getattr(items[-1], column.key))
+        next_cursor = encode_token({"after": last.isoformat()})
+    return {"data": [serialize(item) for item in items], "next_cursor": next_cursor}
+
+
+def _serialize_point(point: models.UnifiedHistory) -> dict[str, Any]:
+    return {"timestamp": point.timestamp.isoformat(), "value": point.value}
+
+
+def _serialize_rollup(rollup: models.UnifiedRollup) -> dict[str, Any]:
+    return {
+        "bucket_start": rollup.bucket_start.isoformat(),
+        "open": rollup.open,
+        "high": rollup.high,
+        "low": rollup.low,
+        "close": rollup.close,
+        "count": rollup.count,
+    }
+
+
+def build_history_body(db: Session, params: HistoryQuery) -> dict[str, Any]:
+    table = models.UnifiedHistory
+    stmt = select(table).where(table.source == params.source.lower(), table.external_id == params.external_id)
+    return _series_page(db, stmt, table.timestamp, params, _serialize_point)
+
+
+def build_rollups_body(db: Session, params: RollupQuery) -> dict[str, Any]:
+    table = models.UnifiedRollup
+    stmt = select(table).where(
+        table.source == params.source.lower(),
+        table.external_id == params.external_id,
+        table.interval == params.interval,
+    )
+    return {"interval": params.interval, **_series_page(db, stmt, table.bucket_start, params, _serialize_rollup)}
+
+
+def _respond(request: Request, entry: CacheEntry, request_id: str, latency) -> Response:
+    if (response := not_modified(request, entry)) is not None:
+        return response
+    return JSONResponse(
+        {**entry.body, "meta": {"request_id": request_id, "api_latency_ms": latency()}},
+        headers=cache_headers(entry),
+    )
+
+
+def _range_entry(db: Session, request: Request, params: RangeQuery) -> CacheEntry:
+    return cached_body(db, request_key(request), lambda: build_range_body(db, params))
+
+
+def _history_entry(db: Session, request: Request, params: HistoryQuery) -> CacheEntry:
+    return cached_body(db, request_key(request), lambda: build_history_body(db, params))
+
+
+def _rollups_entry(db: Session, request: Request, params: RollupQuery) -> CacheEntry:
+    return cached_body(db, request_key(request), lambda: build_rollups_body(db, params))
+
+
+@router.get("/data/latest")
+def get_latest(
+    request: Request,
+    source: str = Query(..., description="Source to read, e.g. coingecko_api"),
+    external_id: list[str] = Query([], description="Assets to return (repeatable); all when omitted"),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: str | None = Query(None),
+    db: Session = Depends(get_db),
+) -> Response:
+    with latency_tracker("/data/latest") as latency:
+        request_id = get_request_meta()
+        entry = cached_body(
+            db, request_key(request), lambda: build_latest_body(db, source, external_id, limit, cursor)
+        )
+        return _respond(request, entry, request_id, latency)
+
+
+@async_router.get("/data/latest")
+async def get_latest_async(
+    request: Request,
+    source: str = Query(..., description="Source to read, e.g. coingecko_api"),
+    external_id: list[str] = Query([], description="Assets to return (repeatable); all when omitted"),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: str | None = Query(None),
+    db: "AsyncSession" = Depends(get_async_db),
+) -> Response:
+    with latency_tracker("/data/latest") as latency:
+        request_id = get_request_meta()
+        entry = await db.run_sync(
+            lambda sync_db: cached_body(
+                sync_db,
+                request_key(request),
+                lambda: build_latest_body(sync_db, source, external_id, limit, cursor),
+            )
+        )
+        return _respond(request, entry, request_id, latency)
+
+
+@router.get("/data/range")
+def get_range(request: Request, params: RangeQuery = Depends(), db: Session = Depends(get_db)) -> Response:
+    with latency_tracker("/data/range") as latency:
+        request_id = get_request_meta()
+        return _respond(request, _range_entry(db, request, params), request_id, latency)
+
+
+@async_router.get("/data/range")
+async def get_range_async(
+    request: Request, params: RangeQuery = Depends(), db: "AsyncSession" = Depends(get_async_db)
+) -> Response:
+    with latency_tracker("/data/range") as latency:
+        request_id = get_request_meta()
+        entry = await db.run_sync(_range_entry, request, params)
+        return _respond(request, entry, request_id, latency)
+
+
+@router.get("/data/history")
+def get_history(request: Request, params: HistoryQuery = Depends(), db: Session = Depends(get_db)) -> Response:
+    with latency_tracker("/data/history") as latency:
+        request_id = get_request_meta()
+        return _respond(request, _history_entry(db, request, params), request_id, latency)
+
+
+@async_router.get("/data/history")
+async def get_history_async(
+    request: Request, params: HistoryQuery = Depends(), db: "AsyncSession" = Depends(get_async_db)
+) -> Response:
+    with latency_tracker("/data/history") as latency:
+        request_id = get_request_meta()
+        entry = await db.run_sync(_history_entry, request, params)
+        return _respond(request, entry, request_id, latency)
+
+
+@router.get("/data/rollups")
+def get_rollups(request: Request, params: RollupQuery = Depends(), db: Session = Depends(get_db)) -> Response:
+    with latency_tracker("/data/rollups") as latency:
+        request_id = get_request_meta()
+        return _respond(request, _rollups_entry(db, request, params), request_id, latency)
+
+
+@async_router.get("/data/rollups")
+async def get_rollups_async(
+    request: Request, params: RollupQuery = Depends(), db: "AsyncSession" = Depends(get_async_db)
+) -> Response:
+    with latency_tracker("/data/rollups") as latency:
+        request_id = get_request_meta()
+        entry = await db.run_sync(_rollups_entry, request, params)
+        return _respond(request, entry, request_id, latency)
@@ -1,41 +1,27 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.api.cache import CacheEntry, cache_headers, cached_body, not_modified, request_key
+from app.api.deps import latency_tracker
+from app.db.session import get_async_db, get_db
 from app.db import models
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 router = APIRouter(tags=["stats"])
+async_router = APIRouter(tags=["stats"])
 
 
-@router.get("/stats")
-def stats(db: Session = Depends(get_db)) -> dict[str, Any]:
-    sub = (
-        db.query(
-            models.EtlRun.source,
-            func.count(models.EtlRun.id).label("total_runs"),
-            func.coalesce(func.sum(models.EtlRun.records_processed), 0).label("total_processed"),
-            func.max(
-                func.nullif(
-                    func.case((models.EtlRun.status == "SUCCESS", models.EtlRun.finished_at)),
-                    None,
-                )
-            ).label("last_success"),
-            func.max(
-                func.nullif(
-                    func.case((models.EtlRun.status == "FAILURE", models.EtlRun.finished_at)),
-                    None,
-                )
-            ).label("last_failure"),
-        )
-        .group_by(models.EtlRun.source)
-        .all()
-    )
+def _compute_stats(db: Session) -> dict[str, Any]:
+    # etl_source_stats is maintained by the ETL runner, one row per source.
+    rows = db.query(models.EtlSourceStats).order_by(models.EtlSourceStats.source).all()
 
     data: list[dict[str, Any]] = []
-    for row in sub:
+    for row in rows:
         data.append(
             {
                 "source": row.source,
@@ -43,6 +29,30 @@ def stats(db: Session = Depends(get_db)) -> dict[str, Any]:
                 "total_processed": int(row.total_processed or 0),
                 "last_success": row.last_success,
                 "last_failure": row.last_failure,
+                "last_duration_seconds": row.last_duration_seconds,
             }
         )
     return {"stats": data}
+
+
+def _stats_entry(db: Session, request: Request) -> CacheEntry:
+    return cached_body(db, request_key(request), lambda: _compute_stats(db))
+
+
+def _stats_response(request: Request, entry: CacheEntry) -> Response:
+    if (response := not_modified(request, entry)) is not None:
+        return response
+    return JSONResponse(entry.body, headers=cache_headers(entry))
+
+
+@router.get("/stats")
+def stats(request: Request, db: Session = Depends(get_db)) -> Response:
+    with latency_tracker("/stats"):
+        return _stats_response(request, _stats_entry(db, request))
+
+
+@async_router.get("/stats")
+async def stats_async(request: Request, db: "AsyncSession" = Depends(get_async_db)) -> Response:
+    with latency_tracker("/stats"):
+        entry = await db.run_sync(_stats_entry, request)
+        return _stats_response(request, entry)
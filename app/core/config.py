@@ -1,9 +1,48 @@
+from functools import lru_cache
+from typing import Any, Literal
+
 from pydantic_settings import BaseSettings
-from pydantic import AnyUrl, ConfigDict, Field
+from pydantic import AnyUrl, BaseModel, ConfigDict, Field
+
+
+class CsvFeed(BaseModel):
+    """A CSV source declared in config rather than code (see ``csv_feeds``)."""
+
+    name: str = Field(pattern=r"^[a-z][a-z0-9_]*$", description="Source name used in unified_records and the CLI")
+    path: str
+    id_column: str = Field(description="Integer, increasing row id used for checkpoints")
+    name_column: str
+    value_column: str
+    timestamp_column: str = Field(description="ISO-8601 timestamps")
+    retention_days: int = Field(default=90, ge=0, description="Days raw rows are kept; 0 keeps them forever")
+    interval_seconds: float = Field(default=900.0, gt=0, description="Seconds between scheduled runs")
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./etl.db"
+    db_async: bool = Field(
+        default=False,
+        description="Serve /data, /stats and /health from async handlers on an asyncio engine"
+    )
+    db_auto_migrate: bool = Field(
+        default=False,
+        description="Apply pending migrations when a process starts instead of only checking the schema version"
+    )
+    db_pool_size: int = Field(
+        default=5,
+        ge=1,
+        description="Persistent connections per engine (ignored for SQLite)"
+    )
+    db_max_overflow: int = Field(
+        default=10,
+        ge=0,
+        description="Extra connections allowed above db_pool_size under load"
+    )
+    db_pool_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds to wait for a pooled connection before failing"
+    )
     # Real CoinGecko API for cryptocurrency market data
     api_source_url: AnyUrl | str = Field(
         default="https://api.coingecko.com/api/v3/coins/markets",
@@ -13,6 +52,166 @@ class Settings(BaseSettings):
         ...,  # Required field - must be set in environment
         description="API key for authentication (if needed)"
     )
+    api_per_page: int = Field(
+        default=250,
+        ge=1,
+        le=250,
+        description="Records requested per CoinGecko page"
+    )
+    api_max_pages: int = Field(
+        default=0,
+        ge=0,
+        description="Upper bound on pages fetched per run (0 = all pages)"
+    )
+    api_max_in_flight: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum concurrent page requests / pooled connections"
+    )
+    api_max_retries: int = Field(
+        default=5,
+        ge=0,
+        description="Retries per page on 429, 5xx and transport errors"
+    )
+    api_backoff_base: float = Field(
+        default=1.0,
+        ge=0,
+        description="Base delay in seconds for exponential backoff"
+    )
+    api_backoff_max: float = Field(
+        default=60.0,
+        ge=0,
+        description="Upper bound in seconds for a single backoff delay"
+    )
+    response_cache_enabled: bool = Field(
+        default=True,
+        description="Cache /data, /stats and /health responses in process"
+    )
+    response_cache_max_entries: int = Field(
+        default=1024,
+        ge=1,
+        description="Maximum number of cached responses"
+    )
+    response_cache_max_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        ge=0,
+        description="Approximate upper bound on cached response bytes"
+    )
+    response_cache_ttl_seconds: float = Field(
+        default=300.0,
+        ge=0,
+        description="Lifetime of a cached response even if no ETL run commits"
+    )
+    response_cache_generation_poll_seconds: float = Field(
+        default=1.0,
+        ge=0,
+        description="How long a read of the ETL data generation is reused"
+    )
+    etl_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        description="Number of unified records written per bulk upsert statement; capped to stay under the bind-parameter limit"
+    )
+    etl_chunk_size: int = Field(
+        default=5000,
+        ge=1,
+        description="Rows read, stored and committed per ETL chunk"
+    )
+    etl_transform_mode: Literal["row", "columnar"] = Field(
+        default="row",
+        description="CSV transform path: per-row Pydantic models or bulk column conversion"
+    )
+    etl_parse_mode: Literal["serial", "parallel"] = Field(
+        default="serial",
+        description="CSV parsing: one reader in the ETL process, or line-aligned byte ranges in a process pool"
+    )
+    etl_parse_workers: int = Field(
+        default=0,
+        ge=0,
+        description="Parser processes for parallel CSV parsing; 0 uses the CPU count"
+    )
+    etl_parse_range_bytes: int = Field(
+        default=4 * 1024 * 1024,
+        ge=1,
+        description="Bytes of CSV parsed per range (and committed per chunk) in parallel mode"
+    )
+    export_batch_size: int = Field(
+        default=2000,
+        ge=1,
+        description="Rows fetched from the server-side cursor per /data/export chunk"
+    )
+    raw_load_method: Literal["auto", "copy", "executemany"] = Field(
+        default="auto",
+        description="Raw table loading: COPY FROM STDIN on PostgreSQL under auto, executemany elsewhere"
+    )
+    history_enabled: bool = Field(
+        default=True,
+        description="Append upserted values of sources with history (the API) to unified_history and its OHLC rollups"
+    )
+    raw_retention_days_api: int = Field(
+        default=30,
+        ge=0,
+        description="Days raw CoinGecko payloads are kept before archival; 0 keeps them forever"
+    )
+    raw_retention_days_csv1: int = Field(
+        default=90,
+        ge=0,
+        description="Days raw CSV source 1 rows are kept before archival; 0 keeps them forever"
+    )
+    raw_retention_days_csv2: int = Field(
+        default=90,
+        ge=0,
+        description="Days raw CSV source 2 rows are kept before archival; 0 keeps them forever"
+    )
+    raw_retention_batch_size: int = Field(
+        default=5000,
+        ge=1,
+        description="Expired raw rows archived and deleted per transaction"
+    )
+    raw_archive_dir: str = Field(
+        default="archive",
+        description="Directory holding source=/day= partitioned raw archives"
+    )
+    etl_parallel: bool = Field(
+        default=False,
+        description="Run ETL sources concurrently, one session per source (PostgreSQL only; SQLite runs serially)"
+    )
+    etl_max_workers: int = Field(
+        default=3,
+        ge=1,
+        description="Maximum number of sources run at once in parallel mode"
+    )
+
+    csv_feeds: list[CsvFeed] = Field(
+        default_factory=list,
+        description="Extra CSV sources as a JSON list of column mappings, stored in raw_records"
+    )
+    etl_watch_poll_seconds: float = Field(
+        default=1.0,
+        gt=0,
+        description="How often --watch mode checks CSV files for changes"
+    )
+    etl_interval_seconds_api: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds between scheduled CoinGecko runs"
+    )
+    etl_interval_seconds_csv1: float = Field(
+        default=900.0,
+        gt=0,
+        description="Seconds between scheduled CSV source 1 runs"
+    )
+    etl_interval_seconds_csv2: float = Field(
+        default=900.0,
+        gt=0,
+        description="Seconds between scheduled CSV source 2 runs"
+    )
+    etl_interval_jitter: float = Field(
+        default=0.1,
+        ge=0,
+        lt=1,
+        description="Random +/- fraction applied to every scheduled interval"
+    )
 
     model_config = ConfigDict(
         env_file=".env",
@@ -22,4 +221,30 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+class _LazySettings:
+    """Module-level ``settings``: builds :class:`Settings` (reading ``.env``) on first use.
+
+    Attribute reads and writes go to the real instance, so ``settings.x`` and
+    ``monkeypatch.setattr(settings, "x", ...)`` behave as before, but merely
+    importing a module that uses settings costs nothing.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
@@ -0,0 +1,56 @@
+"""Optional asyncio engine/session built on SQLAlchemy's asyncio extension.
+
+Imported by ``app.db.session.get_async_db`` on the first request to a
+``DB_ASYNC`` route (and directly by the benchmarks), never at startup.  The
+async drivers (``aiosqlite`` / ``asyncpg``) and greenlet come from
+``requirements-async.txt`` and are not needed by the sync deployment.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL (e.g. ``postgresql+psycopg2://``) to its async driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for database backend {backend!r}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_engine_for(url: str) -> AsyncEngine:
+    async_url = to_async_url(url)
+    if async_url.startswith("sqlite"):
+        return create_async_engine(async_url, connect_args={"timeout": 5})
+    return create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+    )
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine_for(settings.database_url)
+    return _engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _sessionmaker
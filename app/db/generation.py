@@ -0,0 +1,46 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Bumped when a transaction that bumped the table commits, so readers in the
+# same process (e.g. tests or an embedded scheduler) see changes without
+# waiting for the next poll.  A rolled back bump leaves it alone.
+_local_version = 0
+_PENDING = "generation_bumped"
+
+
+def local_version() -> int:
+    return _local_version
+
+
+def bump_generation(db: Session, source: str) -> None:
+    """Increment ``source``'s generation inside the caller's transaction."""
+    table = models.DataGeneration.__table__
+    stmt = update(table).where(table.c.source == source).values(generation=table.c.generation + 1)
+    if db.execute(stmt).rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(source=source, generation=1))
+        except IntegrityError:
+            db.execute(stmt)
+    db.info[_PENDING] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_local_version(session: Session) -> None:
+    global _local_version
+    if session.info.pop(_PENDING, False):
+        _local_version += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_local_version(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def read_generation(db: Session) -> tuple[tuple[str, int], ...]:
+    table = models.DataGeneration.__table__
+    rows = db.execute(select(table.c.source, table.c.generation).order_by(table.c.source))
+    return tuple((row.source, row.generation) for row in rows)
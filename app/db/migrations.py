@@ -0,0 +1,284 @@
+"""Versioned schema migrations.
+
+Each :class:`Migration` has a strictly increasing ``version`` and an
+``upgrade`` callable.  The applied version is stored in the single-row
+``schema_version`` table, so ``upgrade`` only runs what is missing.
+
+Migrations are applied ahead of a deploy with the CLI below (the ``migrate``
+service in docker-compose); the API and ETL processes only compare the
+stored version with :data:`HEAD` when they start (:func:`ensure_schema`),
+unless DB_AUTO_MIGRATE is set.
+
+Ordinary migrations receive a connection inside a transaction.  ``online``
+migrations receive the engine and manage their own transactions so they can
+run next to live traffic: indexes are built with ``CREATE INDEX
+CONCURRENTLY`` on PostgreSQL (:func:`create_index_online`) and backfills
+commit one batch at a time (:func:`backfill_in_batches`).  An online
+migration interrupted half way is simply run again, so each step has to be
+resumable.
+
+Migrations must be idempotent (``IF [NOT] EXISTS``) because version 1 builds
+missing tables from the current models, which may already include objects
+that later migrations add to older databases.
+
+    python -m app.db.migrations upgrade [--target N]
+    python -m app.db.migrations current
+    python -m app.db.migrations check
+"""
+import argparse
+import re
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Index, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import Base
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is older than the code requires."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None] | Callable[[Engine], None]
+    online: bool = False
+
+
+@contextmanager
+def autocommit(engine: Engine) -> Iterator[Connection]:
+    with engine.connect() as conn:
+        yield conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
+def model_index(table: str, name: str) -> Index:
+    return next(index for index in Base.metadata.tables[table].indexes if index.name == name)
+
+
+def create_index_online(engine: Engine, index: Index) -> None:
+    """Create ``index`` if missing without blocking writes on PostgreSQL."""
+    with autocommit(engine) as conn:
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+        if conn.dialect.name == "postgresql":
+            # A failed concurrent build leaves an INVALID index behind that
+            # IF NOT EXISTS would accept; drop it and build again.
+            invalid = conn.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": index.name},
+            ).scalar()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+            ddl = re.sub(r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl)
+        conn.execute(text(ddl))
+
+
+def drop_index_online(engine: Engine, name: str) -> None:
+    with autocommit(engine) as conn:
+        concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+        conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+
+
+def backfill_in_batches(engine: Engine, step: Callable[[Connection, Any], Any], start: Any = None) -> None:
+    """Call ``step(conn, cursor)`` in its own transaction until it returns ``None``.
+
+    ``step`` processes one batch after ``cursor`` and returns the cursor for
+    the next one, so locks are held for one batch at a time.
+    """
+    cursor = start
+    while True:
+        with engine.begin() as conn:
+            cursor = step(conn, cursor)
+        if cursor is None:
+            return
+
+
+def add_missing_columns(conn: Connection) -> None:
+    """Add model columns that are missing from existing tables (nullable/defaulted only)."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def _baseline(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+    add_missing_columns(conn)
+
+
+def _unified_query_indexes(engine: Engine) -> None:
+    # Build the composite indexes before dropping the single-column ones so
+    # queries always have one to use.  (source, external_id) is already
+    # covered by uix_source_external and the primary key needs no extra
+    # index, so the single-column ones only cost writes.
+    for name in ("ix_unified_records_source_id", "ix_unified_records_source_timestamp"):
+        create_index_online(engine, model_index("unified_records", name))
+    for name in ("ix_unified_records_id", "ix_unified_records_source", "ix_unified_records_external_id"):
+        drop_index_online(engine, name)
+
+
+def _history_tables(engine: Engine) -> None:
+    from app.ingestion.history import backfill_history_batch
+
+    with engine.begin() as conn:
+        models.UnifiedHistory.__table__.create(bind=conn, checkfirst=True)
+        models.UnifiedRollup.__table__.create(bind=conn, checkfirst=True)
+    # Points already written are skipped, so a rerun picks up where it stopped.
+    backfill_in_batches(engine, backfill_history_batch, 0)
+
+
+def _raw_received_at_indexes(engine: Engine) -> None:
+    # Retention selects expired rows by received_at.
+    for table in ("raw_api_records", "raw_csv_records", "raw_csv2_records"):
+        create_index_online(engine, model_index(table, f"ix_{table}_received_at"))
+
+
+def _export_window_index(engine: Engine) -> None:
+    # /data/export with start/end but no source orders by (timestamp, id).
+    create_index_online(engine, model_index("unified_records", "ix_unified_records_timestamp_id"))
+
+
+def _raw_records(conn: Connection) -> None:
+    models.RawRecord.__table__.create(bind=conn, checkfirst=True)
+
+
+def _jsonb_payloads(conn: Connection) -> None:
+    # Text json is reparsed on every read and cannot be indexed.  The ALTER
+    # rewrites each table under an exclusive lock, so unlike the online
+    # migrations it has to run in a quiet window.
+    if conn.dialect.name != "postgresql":
+        return
+    for model in (models.RawAPIRecord, models.RawCSVRecord, models.RawCSV2Record, models.RawRecord):
+        data_type = conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table AND column_name = 'payload'"
+            ),
+            {"table": model.__tablename__},
+        ).scalar()
+        if data_type == "json":
+            conn.execute(
+                text(f"ALTER TABLE {model.__tablename__} ALTER COLUMN payload TYPE jsonb USING payload::jsonb")
+            )
+
+
+def _payload_indexes(engine: Engine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    for index in models.RAW_API_PAYLOAD_INDEXES:
+        create_index_online(engine, index)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "baseline tables and columns", _baseline),
+    Migration(2, "composite indexes for unified_records hot queries", _unified_query_indexes, online=True),
+    Migration(3, "unified_history time series and OHLC rollups", _history_tables, online=True),
+    Migration(4, "received_at indexes for raw retention", _raw_received_at_indexes, online=True),
+    Migration(5, "file position columns on checkpoints", add_missing_columns),
+    Migration(6, "raw_records for config-declared feeds", _raw_records),
+    Migration(7, "JSONB raw payloads on PostgreSQL", _jsonb_payloads),
+    Migration(8, "payload key indexes on raw_api_records (PostgreSQL)", _payload_indexes, online=True),
+    Migration(9, "last committed line hash on checkpoints", add_missing_columns),
+    Migration(10, "unified_records (timestamp, id) index for time-window exports", _export_window_index, online=True),
+)
+
+HEAD = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    # One primary-key read, no catalog introspection: this runs on every boot.
+    try:
+        version = conn.execute(select(models.SchemaVersion.version)).scalar()
+    except (OperationalError, ProgrammingError):
+        conn.rollback()  # no schema_version table yet
+        return 0
+    return version or 0
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    table = models.SchemaVersion.__table__
+    if conn.execute(table.update().values(version=version)).rowcount == 0:
+        conn.execute(table.insert().values(id=1, version=version))
+
+
+def upgrade(engine: Engine, target: int | None = None) -> list[Migration]:
+    """Apply pending migrations up to ``target`` (default: head); return those applied."""
+    target = HEAD if target is None else target
+    applied: list[Migration] = []
+    with engine.connect() as conn:
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version or migration.version > target:
+            continue
+        if migration.online:
+            migration.upgrade(engine)
+        with engine.begin() as conn:
+            if not migration.online:
+                migration.upgrade(conn)
+            models.SchemaVersion.__table__.create(bind=conn, checkfirst=True)
+            _set_version(conn, migration.version)
+        applied.append(migration)
+    return applied
+
+
+def check_schema(engine: Engine) -> int:
+    """Return the stored schema version, raising :class:`SchemaVersionError` if it is behind ``HEAD``.
+
+    A newer version is accepted: migrations are additive, so code from the
+    previous release keeps running while a deploy rolls out.
+    """
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version < HEAD:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, this build needs {HEAD}; "
+            "run `python -m app.db.migrations upgrade`"
+        )
+    return version
+
+
+def ensure_schema(engine: Engine) -> int:
+    """Startup hook for the API and ETL processes: apply migrations under DB_AUTO_MIGRATE, else check."""
+    if settings.db_auto_migrate:
+        upgrade(engine)
+    return check_schema(engine)
+
+
+def main(argv=None) -> int:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Manage the database schema version.")
+    parser.add_argument("command", choices=("upgrade", "current", "check"))
+    parser.add_argument("--target", type=int, help="Stop upgrading at this version (default: head)")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        for migration in upgrade(engine, args.target):
+            print(f"Applied {migration.version}: {migration.description}")
+    with engine.connect() as conn:
+        version = current_version(conn)
+    print(f"Schema version {version} (head {HEAD})")
+    return 1 if args.command == "check" and version < HEAD else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, String, DateTime, Float, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.session import Base
+from app.db.types import Payload, payload_text
 
 
 class RawAPIRecord(Base):
@@ -8,8 +9,28 @@ class RawAPIRecord(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(Integer, index=True)
-    payload = Column(JSON, nullable=False)
-    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    payload = Column(Payload, nullable=False)
+    content_hash = Column(String(64), nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+# PostgreSQL only (payload is JSONB there): containment lookups
+# (``payload @> '{"symbol": "btc"}'``) use the GIN index, and the expression
+# indexes serve ``payload_text`` filters such as one coin's payloads over a
+# time window.  SQLite keeps scanning, as it always did.
+RAW_API_PAYLOAD_INDEXES = (
+    Index(
+        "ix_raw_api_records_payload",
+        RawAPIRecord.payload,
+        postgresql_using="gin",
+        postgresql_ops={"payload": "jsonb_path_ops"},
+    ),
+    Index("ix_raw_api_records_payload_id", payload_text(RawAPIRecord.payload, "id"), RawAPIRecord.received_at),
+    Index("ix_raw_api_records_payload_symbol", payload_text(RawAPIRecord.payload, "symbol")),
+    Index("ix_raw_api_records_payload_last_updated", payload_text(RawAPIRecord.payload, "last_updated")),
+)
+for _index in RAW_API_PAYLOAD_INDEXES:
+    _index.ddl_if(dialect="postgresql")
 
 
 class RawCSVRecord(Base):
@@ -17,8 +38,8 @@ class RawCSVRecord(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(Integer, index=True)
-    payload = Column(JSON, nullable=False)
-    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    payload = Column(Payload, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 
 class RawCSV2Record(Base):
@@ -26,22 +47,93 @@ class RawCSV2Record(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(Integer, index=True)
-    payload = Column(JSON, nullable=False)
+    payload = Column(Payload, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class RawRecord(Base):
+    """Raw rows of sources declared in config (``CSV_FEEDS``), tagged by source."""
+
+    __tablename__ = "raw_records"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    external_id = Column(Integer)
+    payload = Column(Payload, nullable=False)
     received_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (Index("ix_raw_records_source_received_at", "source", "received_at"),)
+
 
 class UnifiedRecord(Base):
     __tablename__ = "unified_records"
 
-    id = Column(Integer, primary_key=True, index=True)
-    source = Column(String, index=True)  # api / csv1 / csv2
-    external_id = Column(String, index=True)
+    # Indexes follow the hot query shapes (see app/db/query_plans.py): the
+    # primary key serves unfiltered keyset paging, (source, id) serves /data
+    # filtered by source, uix_source_external serves upsert lookups and
+    # (source, timestamp) serves time-window queries.
+    id = Column(Integer, primary_key=True)
+    source = Column(String)  # api / csv1 / csv2
+    external_id = Column(String)
     name = Column(String, nullable=True)
     value = Column(Integer, nullable=True)
     timestamp = Column(DateTime(timezone=True))
+    content_hash = Column(String(64), nullable=True)  # sha256 of the source payload
 
     __table_args__ = (
         UniqueConstraint("source", "external_id", name="uix_source_external"),
+        Index("ix_unified_records_source_id", "source", "id"),
+        Index("ix_unified_records_source_timestamp", "source", "timestamp"),
+        Index("ix_unified_records_timestamp_id", "timestamp", "id"),
+    )
+
+
+class UnifiedHistory(Base):
+    """Append-only time series of every (source, external_id) value seen.
+
+    ``bucket`` is the UTC day number (days since 1970-01-01) so retention and
+    scans can target whole days without touching the rest of the table.
+    """
+
+    __tablename__ = "unified_history"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    external_id = Column(String, nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    value = Column(Integer, nullable=True)
+    bucket = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("source", "external_id", "timestamp", name="uix_history_point"),
+        Index("ix_unified_history_bucket", "bucket"),
+    )
+
+
+class UnifiedRollup(Base):
+    """OHLC rollups of ``unified_history`` per 1m / 1h / 1d bucket.
+
+    ``open_at`` / ``close_at`` keep the timestamps of the open and close
+    points so late, out-of-order points can be merged incrementally.
+    """
+
+    __tablename__ = "unified_rollups"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    external_id = Column(String, nullable=False)
+    interval = Column(String, nullable=False)  # 1m / 1h / 1d
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    open = Column(Integer, nullable=True)
+    high = Column(Integer, nullable=True)
+    low = Column(Integer, nullable=True)
+    close = Column(Integer, nullable=True)
+    open_at = Column(DateTime(timezone=True), nullable=False)
+    close_at = Column(DateTime(timezone=True), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("source", "external_id", "interval", "bucket_start", name="uix_rollup_bucket"),
     )
 
 
@@ -52,6 +144,14 @@ class Checkpoint(Base):
     source = Column(String, unique=True, index=True)
     last_external_id = Column(Integer, nullable=True)
     last_run_at = Column(DateTime(timezone=True))
+    # Where the last committed chunk of a CSV feed ended, plus enough of the
+    # file's identity to tell an appended file from a replaced one.
+    file_inode = Column(BigInteger, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    file_mtime = Column(Float, nullable=True)
+    file_header_hash = Column(String(64), nullable=True)
+    file_offset = Column(BigInteger, nullable=True)
+    file_tail_hash = Column(String(64), nullable=True)
 
 
 class EtlRun(Base):
@@ -61,6 +161,62 @@ class EtlRun(Base):
     source = Column(String, index=True)
     status = Column(String, index=True)  # SUCCESS / FAILURE
     records_processed = Column(Integer, default=0)
+    records_inserted = Column(Integer, default=0)
+    records_updated = Column(Integer, default=0)
+    batches = Column(Integer, default=0)
+    records_changed = Column(Integer, default=0)
+    records_skipped = Column(Integer, default=0)
     error_message = Column(String, nullable=True)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class EtlRunStage(Base):
+    """Wall time and counters for one stage (fetch, transform, ...) of an ETL run."""
+
+    __tablename__ = "etl_run_stages"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("etl_runs.id", ondelete="CASCADE"), index=True, nullable=False)
+    stage = Column(String, nullable=False)
+    wall_seconds = Column(Float, nullable=False, default=0.0)
+    rows = Column(Integer, nullable=False, default=0)
+    rows_per_second = Column(Float, nullable=False, default=0.0)
+    bytes_read = Column(BigInteger, nullable=False, default=0)
+    statements = Column(Integer, nullable=False, default=0)
+
+
+class EtlSourceStats(Base):
+    """Per-source rollup of ``etl_runs`` maintained by the ETL runner."""
+
+    __tablename__ = "etl_source_stats"
+
+    source = Column(String, primary_key=True)
+    total_runs = Column(Integer, nullable=False, default=0)
+    total_processed = Column(Integer, nullable=False, default=0)
+    last_success = Column(DateTime(timezone=True), nullable=True)
+    last_failure = Column(DateTime(timezone=True), nullable=True)
+    last_duration_seconds = Column(Float, nullable=True)
+
+
+class SchemaVersion(Base):
+    """Single-row table holding the last applied migration (see app/db/migrations.py)."""
+
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DataGeneration(Base):
+    """Per-source change counter bumped by every ETL commit.
+
+    API response caches key on these values, so they are invalidated across
+    processes without polling the data tables themselves.
+    """
+
+    __tablename__ = "data_generations"
+
+    source = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
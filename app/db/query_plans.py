@@ -0,0 +1,135 @@
+"""EXPLAIN-based guard for the hot queries on ``unified_records``.
+
+Each query in :data:`HOT_QUERIES` is explained on the target database and the
+check fails if the plan reads the table sequentially (or, on SQLite, sorts in
+a temporary B-tree instead of walking an index in order).
+
+On PostgreSQL the explain runs with ``enable_seqscan = off``: a small table is
+legitimately cheaper to scan, so this shows the plan the planner falls back
+to at scale, and a remaining ``Seq Scan`` means no index can serve the query.
+
+    python -m app.db.query_plans
+"""
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+TABLE = "unified_records"
+_COLUMNS = "id, source, external_id, name, value, timestamp"
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    sql: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+HOT_QUERIES: tuple[HotQuery, ...] = (
+    HotQuery(
+        "data_keyset",
+        f"SELECT {_COLUMNS} FROM {TABLE} WHERE id > :last_id ORDER BY id LIMIT 11",
+        {"last_id": 1000},
+    ),
+    HotQuery(
+        "data_keyset_by_source",
+        f"SELECT {_COLUMNS} FROM {TABLE} WHERE source = :source AND id > :last_id ORDER BY id LIMIT 11",
+        {"source": "csv1", "last_id": 1000},
+    ),
+    HotQuery(
+        "data_page_by_source",
+        f"SELECT {_COLUMNS} FROM {TABLE} WHERE source = :source ORDER BY id LIMIT 10 OFFSET 0",
+        {"source": "csv1"},
+    ),
+    HotQuery(
+        "count_by_source",
+        f"SELECT count(*) FROM {TABLE} WHERE source = :source",
+        {"source": "csv1"},
+    ),
+    HotQuery(
+        "upsert_lookup",
+        f"SELECT source, external_id, content_hash FROM {TABLE} WHERE source = :source AND external_id IN (:a, :b)",
+        {"source": "csv1", "a": "1", "b": "2"},
+    ),
+    HotQuery(
+        "time_window_by_source",
+        f"SELECT {_COLUMNS} FROM {TABLE} WHERE source = :source "
+        "AND timestamp >= :start AND timestamp < :end ORDER BY timestamp",
+        {"source": "csv1", "start": datetime(2024, 12, 1), "end": datetime(2024, 12, 2)},
+    ),
+    HotQuery(
+        "export_time_window",
+        f"SELECT {_COLUMNS} FROM {TABLE} WHERE timestamp >= :start AND timestamp < :end ORDER BY timestamp, id",
+        {"start": datetime(2024, 12, 1), "end": datetime(2024, 12, 2)},
+    ),
+)
+
+
+def _sqlite_problems(conn: Connection, query: HotQuery) -> list[str]:
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {query.sql}"), query.params).all()
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith(f"SCAN {TABLE}") and "USING" not in detail:
+            problems.append(f"full table scan: {detail}")
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(f"sort not served by an index: {detail}")
+    return problems
+
+
+def _walk(plan: dict[str, Any]):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _walk(child)
+
+
+def _postgres_problems(conn: Connection, query: HotQuery) -> list[str]:
+    with conn.begin_nested() if conn.in_transaction() else conn.begin():
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query.sql}"), query.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        f"sequential scan on {node.get('Relation Name')}"
+        for node in _walk(plan[0]["Plan"])
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == TABLE
+    ]
+
+
+def check_query_plans(engine: Engine) -> dict[str, list[str]]:
+    """Return ``{query name: problems}`` for every hot query with a bad plan."""
+    failures: dict[str, list[str]] = {}
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            explain = _sqlite_problems
+        elif dialect == "postgresql":
+            explain = _postgres_problems
+        else:
+            raise RuntimeError(f"Query plan check is not implemented for {dialect}")
+        for query in HOT_QUERIES:
+            problems = explain(conn, query)
+            if problems:
+                failures[query.name] = problems
+    return failures
+
+
+def main() -> int:
+    from app.db.session import engine
+
+    failures = check_query_plans(engine)
+    for name, problems in failures.items():
+        for problem in problems:
+            print(f"{name}: {problem}")
+    if not failures:
+        print(f"All {len(HOT_QUERIES)} hot queries are served by indexes.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,77 @@
+"""Engine and session factory, built on first use.
+
+Importing models or routes neither reads settings nor loads a DBAPI driver;
+``get_engine()`` / ``get_sessionmaker()`` (also reachable as the module
+attributes ``engine`` and ``SessionLocal``) create them the first time a
+database is actually needed.
+"""
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-import sqlalchemy
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
-SQLALCHEMY_DATABASE_URL = settings.database_url
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    future=True,
-    pool_pre_ping=True,
-    echo=False,
-    pool_recycle=3600,
-    connect_args={"timeout": 5} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 Base = declarative_base()
 
 
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    url = settings.database_url
+    pool_args = (
+        {}
+        if "sqlite" in url
+        else {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        }
+    )
+    return create_engine(
+        url,
+        future=True,
+        pool_pre_ping=True,
+        echo=False,
+        pool_recycle=3600,
+        connect_args={"timeout": 5} if "sqlite" in url else {},
+        **pool_args,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine(), future=True)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """Dependency for the DB_ASYNC routes.
+
+    ``app.db.async_session`` (SQLAlchemy's asyncio extension and the async
+    drivers) is imported on the first request, so sync deployments never load it.
+    """
+    from app.db.async_session import get_async_sessionmaker
+
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,60 @@
+"""Dialect-aware column types and expressions.
+
+``Payload`` is stored as ``JSONB`` on PostgreSQL -- parsed once on write,
+indexable with GIN and expression indexes -- and as the generic ``JSON``
+type everywhere else.  Either way the column type is a ``JSON`` instance, so
+code checking for JSON columns keeps working.
+
+``payload_text(column, key)`` reads one top-level key as text.  On
+PostgreSQL it renders as ``(payload ->> 'key')`` with the key inlined, which
+is exactly the expression the indexes in ``app.db.models`` are built on, so
+the planner can use them whatever the driver does with bound parameters.
+Other dialects use ``JSON_EXTRACT``.
+
+Timestamps are stored and compared as naive UTC (SQLite drops the offset);
+:func:`naive_utc` converts aware values and leaves naive ones, taken to be
+UTC already, untouched.
+"""
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, String, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+Payload = JSON().with_variant(JSONB(), "postgresql")
+
+
+class payload_text(FunctionElement):
+    type = String()
+    inherit_cache = True
+    name = "payload_text"
+
+    def __init__(self, column, key: str):
+        if not re.fullmatch(r"\w+", key):
+            raise ValueError(f"Invalid payload key {key!r}")
+        super().__init__(column, literal_column(f"'{key}'"))
+
+
+def _parts(element, compiler, **kw) -> tuple[str, str]:
+    column, key = element.clauses
+    return compiler.process(column, **kw), key.name
+
+
+@compiles(payload_text)
+def _payload_text_default(element, compiler, **kw):
+    column, key = _parts(element, compiler, **kw)
+    return f"JSON_EXTRACT({column}, '$.{key[1:-1]}')"
+
+
+@compiles(payload_text, "postgresql")
+def _payload_text_postgresql(element, compiler, **kw):
+    column, key = _parts(element, compiler, **kw)
+    return f"({column} ->> {key})"
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
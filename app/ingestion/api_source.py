@@ -1,14 +1,246 @@
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import aclosing
+from email.utils import parsedate_to_datetime
 from typing import Any
-from datetime import datetime
+from datetime import datetime, timezone
+import asyncio
+import queue
+import threading
 
-import requests
+import httpx
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db import models
+from app.db.types import payload_text
+from app.ingestion.hashing import content_hash, stable_external_id, stored_hashes
+from app.ingestion.instrumentation import record_bytes
+from app.ingestion.raw_loader import load_raw
 from app.schemas.unified import UnifiedRecordCreate
 
+API_SOURCE = "coingecko_api"
+# Seconds iter_pages waits for a cancelled producer to close its requests.
+CANCEL_TIMEOUT = 5.0
+
+
+class Page(list):
+    """One page of market records; ``nbytes`` is the size of the response body."""
+
+    nbytes: int = 0
+
+
+class CoinGeckoFetcher:
+    """Paginated CoinGecko client backed by a pooled ``httpx.AsyncClient``.
+
+    The client lives on a dedicated event-loop thread so that connections are
+    reused across runs.  Pages are requested ahead of the consumer with at most
+    ``max_in_flight`` outstanding requests and are yielded in page order as
+    soon as they arrive.  429 and 5xx responses are retried with exponential
+    backoff, honouring ``Retry-After`` when the server sends one.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        per_page: int | None = None,
+        max_pages: int | None = None,
+        max_in_flight: int | None = None,
+        max_retries: int | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.url = url or str(settings.api_source_url)
+        self.per_page = per_page or settings.api_per_page
+        self.max_pages = settings.api_max_pages if max_pages is None else max_pages
+        self.max_in_flight = max_in_flight or settings.api_max_in_flight
+        self.max_retries = settings.api_max_retries if max_retries is None else max_retries
+        self.backoff_base = settings.api_backoff_base if backoff_base is None else backoff_base
+        self.backoff_max = settings.api_backoff_max if backoff_max is None else backoff_max
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    # -- event loop / pool lifecycle -------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="coingecko-fetcher", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {}
+            if settings.api_key and settings.api_key != "":
+                headers["X-API-Key"] = settings.api_key
+            self._client = httpx.AsyncClient(
+                headers=headers,
+                timeout=10,
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+        if loop is None:
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # -- fetching --------------------------------------------------------
+
+    def _retry_delay(self, attempt: int, resp: httpx.Response | None) -> float:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    when = parsedate_to_datetime(retry_after)
+                    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt))
+
+    async def _get_page(self, page: int) -> Page:
+        params = {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": self.per_page,
+            "page": page,
+            "sparkline": "false",
+            "locale": "en",
+        }
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            resp: httpx.Response | None = None
+            try:
+                resp = await client.get(self.url, params=params)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if resp.status_code != 429 and resp.status_code < 500:
+                    resp.raise_for_status()
+                    items = Page(resp.json())
+                    items.nbytes = len(resp.content)
+                    return items
+                if attempt == self.max_retries:
+                    resp.raise_for_status()
+            await asyncio.sleep(self._retry_delay(attempt, resp))
+        raise RuntimeError("unreachable")
+
+    async def aiter_pages(self) -> AsyncIterator[Page]:
+        """Yield non-empty pages in order until a short page is returned."""
+        tasks: dict[int, asyncio.Task] = {}
+        next_page = current = 1
+        try:
+            while True:
+                while len(tasks) < self.max_in_flight and (not self.max_pages or next_page <= self.max_pages):
+                    tasks[next_page] = asyncio.create_task(self._get_page(next_page))
+                    next_page += 1
+                if current not in tasks:
+                    return
+                items = await tasks.pop(current)
+                if items:
+                    yield items
+                if len(items) < self.per_page:
+                    return
+                current += 1
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    def iter_pages(self) -> Iterator[Page]:
+        """Synchronous view of :meth:`aiter_pages` for the ETL runner."""
+        loop = self._ensure_loop()
+        pages: queue.Queue = queue.Queue(maxsize=self.max_in_flight)
+        stop = threading.Event()
+        finished = threading.Event()
+
+        async def put(item) -> None:
+            while not stop.is_set():
+                try:
+                    pages.put_nowait(item)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+
+        async def pump() -> None:
+            try:
+                async with aclosing(self.aiter_pages()) as agen:
+                    async for page in agen:
+                        await put(page)
+                        if stop.is_set():
+                            return
+            except Exception as exc:  # noqa: BLE001
+                await put(exc)
+            else:
+                await put(_DONE)
+            finally:
+                finished.set()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # A consumer that stops early must not sit through the producer's
+            # remaining retries and backoff sleeps: cancel it, then give the
+            # in-flight requests a bounded time to be closed.
+            stop.set()
+            future.cancel()
+            finished.wait(CANCEL_TIMEOUT)
+
+
+_DONE = object()
+_fetcher: CoinGeckoFetcher | None = None
+
+
+def get_fetcher() -> CoinGeckoFetcher:
+    """Return the process-wide fetcher so its connection pool is reused."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = CoinGeckoFetcher()
+    return _fetcher
+
+
+def close_fetcher() -> None:
+    """Close the process-wide fetcher's event loop and connection pool."""
+    global _fetcher
+    if _fetcher is not None:
+        _fetcher.close()
+        _fetcher = None
+
+
+def iter_api_records(last_external_id: int | None = None) -> Iterator[dict[str, Any]]:
+    """Stream CoinGecko market records page by page."""
+    for page in get_fetcher().iter_pages():
+        record_bytes(page.nbytes)
+        yield from page
+
 
 def fetch_api_data(last_external_id: int | None = None) -> list[dict[str, Any]]:
     """Fetch cryptocurrency market data from CoinGecko API.
@@ -20,40 +252,61 @@ def fetch_api_data(last_external_id: int | None = None) -> list[dict[str, Any]]:
     - Price changes
     
     Supports top cryptocurrencies: Bitcoin, Ethereum, Cardano, Solana, Polkadot, etc.
+    Every page of ``/coins/markets`` is fetched, not only the first 250 coins.
     No API key required for free tier.
     """
-    params = {
-        "vs_currency": "usd",
-        "order": "market_cap_desc",
-        "per_page": 250,
-        "page": 1,
-        "sparkline": False,
-        "locale": "en"
-    }
-    
-    headers = {}
-    if settings.api_key and settings.api_key != "":
-        headers["X-API-Key"] = settings.api_key
-    
-    resp = requests.get(str(settings.api_source_url), params=params, headers=headers, timeout=10)
-    resp.raise_for_status()
-    items: list[dict[str, Any]] = resp.json()
+    return list(iter_api_records(last_external_id))
+
+
+def api_unified_key(rec: dict[str, Any]) -> str:
+    """The ``external_id`` a CoinGecko record is stored under in ``unified_records``."""
+    return str(rec.get("id", "unknown")).lower()
+
+
+def select_changed_api_records(
+    db: Session, records: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], dict[str, str]]:
+    """Drop records whose payload hash matches the one last stored.
+
+    Returns the changed records and their content hashes keyed by unified
+    external id.
+    """
+    hashes = {api_unified_key(rec): content_hash(rec) for rec in records}
+    previous = stored_hashes(db, API_SOURCE, hashes)
+    changed = [rec for rec in records if previous.get(api_unified_key(rec)) != hashes[api_unified_key(rec)]]
+    return changed, hashes
 
-    if last_external_id is not None:
-        pass # items = [item for item in items if int(item.get("id", 0) or 0) > last_external_id]
 
-    return items
+def api_external_id(rec: dict[str, Any]) -> int:
+    """Integer id a CoinGecko record is stored under in ``raw_api_records``."""
+    # Stable digest of CoinGecko's unique identifier; hash() is salted per process
+    return stable_external_id(str(rec.get("id", "")))
 
 
-def store_raw_api(db: Session, records: Iterable[dict[str, Any]]) -> list[int]:
-    ids: list[int] = []
+def store_raw_api(
+    db: Session, records: Iterable[dict[str, Any]], hashes: dict[str, str] | None = None
+) -> list[int]:
+    rows = []
     for rec in records:
-        # Use CoinGecko's unique identifier as external_id
-        external_id = hash(rec.get("id", "")) % (10 ** 8)
-        raw = models.RawAPIRecord(external_id=int(external_id), payload=rec)
-        db.add(raw)
-        ids.append(int(external_id))
-    return ids
+        key = api_unified_key(rec)
+        digest = hashes[key] if hashes and key in hashes else content_hash(rec)
+        rows.append({"external_id": api_external_id(rec), "payload": rec, "content_hash": digest})
+    load_raw(db, models.RawAPIRecord.__table__, rows)
+    return [row["external_id"] for row in rows]
+
+
+def select_raw_api_payloads(coin_id: str, since: datetime | None = None, until: datetime | None = None) -> Select:
+    """Stored payloads for one CoinGecko id, oldest first, optionally within ``since``..``until``.
+
+    On PostgreSQL this is served by ``ix_raw_api_records_payload_id``.
+    """
+    table = models.RawAPIRecord
+    stmt = select(table.payload, table.received_at).where(payload_text(table.payload, "id") == coin_id)
+    if since is not None:
+        stmt = stmt.where(table.received_at >= since)
+    if until is not None:
+        stmt = stmt.where(table.received_at < until)
+    return stmt.order_by(table.received_at)
 
 
 def transform_api_to_unified(records: Iterable[dict[str, Any]]) -> list[UnifiedRecordCreate]:
@@ -89,7 +342,7 @@ def transform_api_to_unified(records: Iterable[dict[str, Any]]) -> list[UnifiedR
             
             unified.append(
                 UnifiedRecordCreate(
-                    source="coingecko_api",
+                    source=API_SOURCE,
                     external_id=ext_id,
                     name=full_name,
                     value=int(price) if price else 0,
@@ -0,0 +1,216 @@
+"""Set-based writers for the unified table.
+
+Records are written in batches with a single statement per batch instead of
+one SELECT plus one INSERT/UPDATE per row.  PostgreSQL and SQLite use their
+native ``INSERT ... ON CONFLICT DO UPDATE`` and tell inserts from updates
+from the statement's own RETURNING; any other dialect looks the keys up first
+and falls back to an ``executemany`` INSERT for new keys and an
+``executemany`` UPDATE for existing ones.
+"""
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, TypeVar
+
+from sqlalchemy import bindparam, func, insert, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.ingestion.history import append_history
+from app.schemas.unified import UnifiedRecordCreate
+
+T = TypeVar("T")
+
+UNIFIED_COLUMNS = ("source", "external_id", "name", "value", "timestamp", "content_hash")
+UPDATE_COLUMNS = ("name", "value", "timestamp", "content_hash")
+NATIVE_UPSERT_DIALECTS = ("postgresql", "sqlite")
+# A multi-row VALUES binds every column of every row.  SQLite allows 32766
+# parameters per statement (PostgreSQL 65535), so batches are capped to stay
+# under the smaller limit whatever ETL_BATCH_SIZE says.
+MAX_BIND_PARAMS = 32766
+MAX_BATCH_ROWS = MAX_BIND_PARAMS // len(UNIFIED_COLUMNS)
+
+
+@dataclass
+class BatchResult:
+    inserted: int = 0
+    updated: int = 0
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    batches: int = 0
+
+    def add(self, batch: BatchResult) -> None:
+        self.inserted += batch.inserted
+        self.updated += batch.updated
+        self.batches += 1
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+class Chunk(list):
+    """Rows committed together, with the file position after the last one.
+
+    ``unified`` carries the chunk's unified records when they were already
+    transformed elsewhere (the parallel CSV parser does it in its workers).
+    """
+
+    def __init__(self, rows: Iterable = (), position: Any = None, unified: Any = None):
+        super().__init__(rows)
+        self.position = position
+        self.unified = unified
+
+
+class RowChunks:
+    """Group a row stream into ``Chunk`` objects of ``size`` rows.
+
+    ``position`` mirrors the stream's own (a ``CsvTail`` tracks one), so it is
+    the position after the last row read.
+    """
+
+    def __init__(self, rows: Iterable, size: int):
+        self.rows = rows
+        self.size = size
+
+    @property
+    def position(self) -> Any:
+        return getattr(self.rows, "position", None)
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for batch in chunked(self.rows, self.size):
+            yield Chunk(batch, self.position)
+
+
+def _as_row(rec: UnifiedRecordCreate | Mapping[str, Any]) -> dict[str, Any]:
+    if isinstance(rec, UnifiedRecordCreate):
+        rec = rec.model_dump()
+    return {col: rec.get(col) for col in UNIFIED_COLUMNS}
+
+
+def _dedupe(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    # ON CONFLICT cannot touch the same row twice in one statement; the last
+    # occurrence wins, matching the old row-by-row behaviour.
+    by_key: dict[tuple[str, str], dict[str, Any]] = {}
+    for row in rows:
+        by_key[(row["source"], row["external_id"])] = row
+    return list(by_key.values())
+
+
+def _existing_keys(db: Session, rows: list[dict[str, Any]]) -> set[tuple[str, str]]:
+    table = models.UnifiedRecord.__table__
+    ids_by_source: dict[str, list[str]] = {}
+    for row in rows:
+        ids_by_source.setdefault(row["source"], []).append(row["external_id"])
+
+    found: set[tuple[str, str]] = set()
+    for source, external_ids in ids_by_source.items():
+        result = db.execute(
+            select(table.c.source, table.c.external_id).where(
+                table.c.source == source,
+                table.c.external_id.in_(external_ids),
+            )
+        )
+        found.update((r.source, r.external_id) for r in result)
+    return found
+
+
+def _native_upsert(db: Session, rows: list[dict[str, Any]]) -> int:
+    """Upsert ``rows`` in one statement and return how many were inserted."""
+    table = models.UnifiedRecord.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        conflict = {"constraint": "uix_source_external"}
+        # xmax is 0 on a freshly inserted row version and set on an updated one.
+        inserted = literal_column("xmax = 0")
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        conflict = {"index_elements": ["source", "external_id"]}
+        # New rows get rowids above the current maximum; updated rows keep theirs.
+        max_id = db.execute(select(func.max(table.c.id))).scalar() or 0
+        inserted = table.c.id > max_id
+
+    stmt = dialect_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        **conflict,
+        set_={col: stmt.excluded[col] for col in UPDATE_COLUMNS},
+    ).returning(inserted)
+    return sum(1 for (new,) in db.execute(stmt) if new)
+
+
+def _fallback_upsert(db: Session, rows: list[dict[str, Any]], existing: set[tuple[str, str]]) -> None:
+    table = models.UnifiedRecord.__table__
+    new_rows = [r for r in rows if (r["source"], r["external_id"]) not in existing]
+    old_rows = [
+        {f"b_{k}": v for k, v in r.items()}
+        for r in rows
+        if (r["source"], r["external_id"]) in existing
+    ]
+    if new_rows:
+        db.execute(insert(table), new_rows)
+    if old_rows:
+        stmt = (
+            update(table)
+            .where(
+                table.c.source == bindparam("b_source"),
+                table.c.external_id == bindparam("b_external_id"),
+            )
+            .values({col: bindparam(f"b_{col}") for col in UPDATE_COLUMNS})
+        )
+        db.execute(stmt, old_rows)
+
+
+def upsert_batch(db: Session, rows: list[dict[str, Any]], native: bool | None = None) -> BatchResult:
+    rows = _dedupe(rows)
+    if not rows:
+        return BatchResult()
+
+    if native is None:
+        native = db.get_bind().dialect.name in NATIVE_UPSERT_DIALECTS
+    if native:
+        inserted = _native_upsert(db, rows)
+    else:
+        existing = _existing_keys(db, rows)
+        _fallback_upsert(db, rows, existing)
+        inserted = len(rows) - len(existing)
+
+    return BatchResult(inserted=inserted, updated=len(rows) - inserted)
+
+
+def bulk_upsert_unified(
+    db: Session,
+    records: Iterable[UnifiedRecordCreate | Mapping[str, Any]],
+    batch_size: int | None = None,
+    on_batch: Callable[[BatchResult], None] | None = None,
+    native: bool | None = None,
+    history: bool = True,
+) -> UpsertResult:
+    """Upsert ``records`` into ``unified_records`` keyed on (source, external_id).
+
+    Accepts ``UnifiedRecordCreate`` models or plain mappings with the unified
+    columns.  With ``history`` each batch is also appended to
+    ``unified_history`` (see ``app.ingestion.history``) unless HISTORY_ENABLED
+    is off.  ``on_batch``
+    is called after every batch is written so callers can report progress;
+    ``native=False`` forces the portable fallback.
+    """
+    size = min(batch_size or settings.etl_batch_size, MAX_BATCH_ROWS)
+    result = UpsertResult()
+    for batch in chunked(map(_as_row, records), size):
+        batch_result = upsert_batch(db, batch, native=native)
+        if history and settings.history_enabled:
+            append_history(db, batch)
+        result.add(batch_result)
+        if on_batch is not None:
+            on_batch(batch_result)
+    return result
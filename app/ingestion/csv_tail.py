@@ -0,0 +1,199 @@
+"""Resumable reads of append-only CSV feeds.
+
+A :class:`CsvTail` reads the file as bytes, tracking the offset just past
+the last row it yielded, and exposes it together with the file's identity as
+a :class:`FilePosition` that ``run_for_source`` stores on the source's
+``Checkpoint`` with every committed chunk.  The next run seeks straight to
+that offset when the file is still the same one (same inode and header, at
+least as long, and the line ending at the offset is unchanged); otherwise it
+was truncated, replaced or rewritten in place and the whole file is
+rescanned, with ``last_external_id`` still skipping rows already loaded.
+
+A trailing line without a newline is read when the file has not grown since
+the read started, so a feed saved without a final newline loses nothing.
+With ``hold_partial`` (``--watch``, where a writer is expected to be
+appending) it is treated as still being written and left for the next run.
+A checkpoint taken after such a line is only resumed while the file still
+ends there; once it grows the file is rescanned, as the line may have been
+completed.  :func:`open_tail` holds the header and resume logic shared with
+the parallel reader in ``app.ingestion.parallel_csv``.
+"""
+import csv
+import hashlib
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.ingestion.instrumentation import open_binary_counted
+
+
+@dataclass(frozen=True)
+class FilePosition:
+    inode: int | None
+    size: int
+    mtime: float
+    header_hash: str
+    offset: int
+    # Hash of the line ending at ``offset``; ``None`` for checkpoints saved
+    # before it was recorded, which are never resumed.
+    tail_hash: str | None = None
+
+
+def line_hash(line: bytes) -> str:
+    return hashlib.sha256(line.rstrip(b"\r\n")).hexdigest()
+
+
+def file_signature(path: Path) -> tuple[int, int, float] | None:
+    """Cheap (inode, size, mtime) fingerprint used to notice that a file changed."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime
+
+
+def can_resume(saved: FilePosition | None, inode: int | None, size: int, digest: str) -> bool:
+    """Whether ``saved`` may still describe this file; :func:`open_tail` also checks its ``tail_hash``."""
+    return (
+        saved is not None
+        and saved.offset > 0
+        and saved.tail_hash is not None
+        and saved.inode == inode
+        and saved.header_hash == digest
+        and size >= saved.offset
+    )
+
+
+def _read_header(raw) -> bytes:
+    # Read the header in small unbuffered blocks so resuming does not pull a
+    # whole buffer of already-ingested rows just to hash the first line.
+    data = b""
+    while b"\n" not in data:
+        block = raw.read(512)
+        if not block:
+            return data
+        data += block
+    return data[: data.index(b"\n") + 1]
+
+
+def line_ending_at(raw, offset: int, floor: int) -> bytes:
+    """The line of ``raw`` that ends at ``offset``, read backwards without going before ``floor``."""
+    data, end = b"", offset
+    while end > floor:
+        start = max(floor, end - 256)
+        raw.seek(start)
+        data = raw.read(end - start) + data
+        end = start
+        cut = data.rfind(b"\n", 0, len(data) - 1)
+        if cut >= 0:
+            return data[cut + 1:]
+    return data
+
+
+@dataclass(frozen=True)
+class TailStart:
+    """Where reading a file starts: its identity, header and first unread byte."""
+
+    inode: int
+    size: int
+    mtime: float
+    header_hash: str
+    fieldnames: list[str]
+    data_start: int
+    offset: int
+    tail_hash: str
+    resumed: bool
+
+    def position(self, at: int, last_line: bytes | None = None) -> FilePosition:
+        """The position at ``at``, where ``last_line`` ended (``None`` when ``at`` is still ``offset``)."""
+        tail = self.tail_hash if last_line is None else line_hash(last_line)
+        return FilePosition(self.inode, max(self.size, at), self.mtime, self.header_hash, at, tail)
+
+
+def unchanged_since(start: TailStart, path: Path) -> bool:
+    """Whether ``path`` still has the size it had when ``start`` was taken."""
+    return os.stat(path).st_size == start.size
+
+
+def open_tail(f, path: Path, saved: FilePosition | None, encoding: str = "utf-8") -> TailStart | None:
+    """Read the header from the counted file ``f`` and seek it to where reading resumes.
+
+    Returns ``None`` while the header line is still incomplete.
+    """
+    st = os.stat(path)
+    header = _read_header(f.raw)
+    if not header.endswith(b"\n"):
+        return None
+    digest = line_hash(header)
+    fieldnames = next(csv.reader([header.decode(encoding)]))
+    resumed = can_resume(saved, st.st_ino, st.st_size, digest)
+    if resumed:
+        # Same inode, header and length can still be an in-place rewrite;
+        # only resume if the last committed line is still the saved one (and
+        # complete, unless nothing was written after it).
+        last_line = line_ending_at(f.raw, saved.offset, len(header))
+        resumed = line_hash(last_line) == saved.tail_hash and (
+            last_line.endswith(b"\n") or st.st_size == saved.offset
+        )
+    offset, tail = (saved.offset, saved.tail_hash) if resumed else (len(header), line_hash(b""))
+    f.seek(offset)
+    return TailStart(st.st_ino, st.st_size, st.st_mtime, digest, fieldnames, len(header), offset, tail, resumed)
+
+
+class CsvTail:
+    """Iterate rows of ``path`` newer than ``last_external_id``, resuming at ``saved``.
+
+    ``hold_partial`` leaves a trailing line without a newline unread.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        id_column: str,
+        last_external_id: int | None = None,
+        saved: FilePosition | None = None,
+        encoding: str = "utf-8",
+        hold_partial: bool = False,
+    ):
+        self.path = path
+        self.id_column = id_column
+        self.last_external_id = last_external_id
+        self.saved = saved
+        self.encoding = encoding
+        self.hold_partial = hold_partial
+        self.resumed = False
+        self._start: TailStart | None = None
+        self._offset = 0
+        self._last_line: bytes | None = None
+
+    @property
+    def position(self) -> FilePosition | None:
+        """Position just past the last row read (built on access, not per row)."""
+        if self._start is None:
+            return None
+        return self._start.position(self._offset, self._last_line)
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self.path.exists():
+            return
+        with open_binary_counted(self.path) as f:
+            start = open_tail(f, self.path, self.saved, self.encoding)
+            if start is None:
+                return
+            self.resumed = start.resumed
+            self._start, self._offset, self._last_line = start, start.offset, None
+
+            def lines() -> Iterator[str]:
+                while line := f.readline():
+                    if not line.endswith(b"\n") and (self.hold_partial or not unchanged_since(start, self.path)):
+                        return  # still being written
+                    self._offset += len(line)
+                    self._last_line = line
+                    yield line.decode(self.encoding)
+
+            for row in csv.DictReader(lines(), fieldnames=start.fieldnames):
+                ext_id = int(row[self.id_column])
+                if self.last_external_id is not None and ext_id <= self.last_external_id:
+                    continue
+                yield row
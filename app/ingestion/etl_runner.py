@@ -1,16 +1,25 @@
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
+import argparse
+import logging
+import signal
+import sys
+import threading
 
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal, engine, Base
+from app.db.migrations import ensure_schema
 from app.db import models
-from app.ingestion.api_source import fetch_api_data, store_raw_api, transform_api_to_unified
-from app.ingestion.csv_source1 import read_csv1, store_raw_csv1, transform_csv1_to_unified
-from app.ingestion.csv_source2 import read_csv2, store_raw_csv2, transform_csv2_to_unified
+from app.db.generation import bump_generation
+from app.core.config import settings
+from app.ingestion.bulk import BatchResult, UpsertResult, bulk_upsert_unified
+from app.ingestion.csv_tail import FilePosition, file_signature
+from app.ingestion.instrumentation import StageRecorder, recording, stage
+from app.ingestion.source_stats import record_progress, record_run_finished, record_run_started
+from app.ingestion.sources import file_source_names, get_source, source_names
 
-
-SOURCES = ("api", "csv1", "csv2")
+logger = logging.getLogger(__name__)
 
 
 def get_checkpoint(db: Session, source: str) -> int | None:
@@ -18,7 +27,18 @@ def get_checkpoint(db: Session, source: str) -> int | None:
     return cp.last_external_id if cp else None
 
 
-def update_checkpoint(db: Session, source: str, last_external_id: int | None):
+def get_file_position(db: Session, source: str) -> FilePosition | None:
+    cp = db.query(models.Checkpoint).filter_by(source=source).first()
+    if cp is None or cp.file_offset is None:
+        return None
+    return FilePosition(
+        cp.file_inode, cp.file_size, cp.file_mtime, cp.file_header_hash, cp.file_offset, cp.file_tail_hash
+    )
+
+
+def update_checkpoint(
+    db: Session, source: str, last_external_id: int | None, position: FilePosition | None = None
+):
     cp = db.query(models.Checkpoint).filter_by(source=source).first()
     now = datetime.utcnow()
     if cp is None:
@@ -27,81 +47,209 @@ def update_checkpoint(db: Session, source: str, last_external_id: int | None):
     else:
         cp.last_external_id = last_external_id
         cp.last_run_at = now
+    if position is not None:
+        cp.file_inode = position.inode
+        cp.file_size = position.size
+        cp.file_mtime = position.mtime
+        cp.file_header_hash = position.header_hash
+        cp.file_offset = position.offset
+        cp.file_tail_hash = position.tail_hash
+
+
+def upsert_unified_records(
+    db: Session, unified, run: models.EtlRun | None = None, history: bool = True
+) -> UpsertResult:
+    def record_batch(batch: BatchResult):
+        if run is not None:
+            run.records_inserted = (run.records_inserted or 0) + batch.inserted
+            run.records_updated = (run.records_updated or 0) + batch.updated
+            run.batches = (run.batches or 0) + 1
+
+    return bulk_upsert_unified(db, unified, on_batch=record_batch, history=history)
+
+
+def commit_run(db: Session, source: str):
+    """Commit the current ETL transaction and invalidate cached API responses."""
+    bump_generation(db, source)
+    db.commit()
 
 
-def upsert_unified_records(db: Session, unified):
-    for rec in unified:
-        existing = (
-            db.query(models.UnifiedRecord)
-            .filter_by(source=rec.source, external_id=rec.external_id)
-            .first()
-        )
-        if existing:
-            existing.name = rec.name
-            existing.value = rec.value
-            existing.timestamp = rec.timestamp
-        else:
-            db.add(
-                models.UnifiedRecord(
-                    source=rec.source,
-                    external_id=rec.external_id,
-                    name=rec.name,
-                    value=rec.value,
-                    timestamp=rec.timestamp,
-                )
+def save_stages(db: Session, run: models.EtlRun, recorder: StageRecorder):
+    for name, stats in recorder.stages.items():
+        db.add(
+            models.EtlRunStage(
+                run_id=run.id,
+                stage=name,
+                wall_seconds=stats.wall_seconds,
+                rows=stats.rows,
+                rows_per_second=stats.rows_per_second,
+                bytes_read=stats.bytes_read,
+                statements=stats.statements,
             )
+        )
+
 
+def run_for_source(db: Session, source: str, chunk_size: int | None = None, tail: bool = False):
+    """Run one source as a sequence of committed chunks.
 
-def run_for_source(db: Session, source: str):
+    Each chunk is stored raw, transformed, upserted and checkpointed in its own
+    transaction, so memory is bounded by ``chunk_size`` and a failure only
+    loses the chunk in flight; the next run resumes from the last checkpoint.
+    Per-stage timings are saved to ``etl_run_stages`` with the final status.
+    ``tail`` (watch mode) leaves a CSV line without a trailing newline for the
+    next run, as its writer may still be appending to it.
+    """
     run = models.EtlRun(source=source, status="RUNNING", records_processed=0)
     db.add(run)
-    db.commit()
+    record_run_started(db, source)
+    commit_run(db, source)
     db.refresh(run)
 
-    try:
-        last_external_id = get_checkpoint(db, source)
-        if source == "api":
-            data = fetch_api_data(last_external_id)
-            raw_ids = store_raw_api(db, data)
-            unified = transform_api_to_unified(data)
-        elif source == "csv1":
-            rows = read_csv1(last_external_id)
-            raw_ids = store_raw_csv1(db, rows)
-            unified = transform_csv1_to_unified(rows)
-        elif source == "csv2":
-            rows = read_csv2(last_external_id)
-            raw_ids = store_raw_csv2(db, rows)
-            unified = transform_csv2_to_unified(rows)
-        else:
-            raise ValueError(f"Unknown source {source}")
-
-        upsert_unified_records(db, unified)
-        new_last_id = max(raw_ids) if raw_ids else last_external_id
-        update_checkpoint(db, source, new_last_id)
-
-        run.status = "SUCCESS"
-        run.records_processed = len(unified)
-        run.finished_at = datetime.utcnow()
-        db.commit()
-    except Exception as exc:  # noqa: BLE001
-        db.rollback()
-        run.status = "FAILURE"
-        run.error_message = str(exc)
-        run.finished_at = datetime.utcnow()
-        db.commit()
-        raise
+    recorder = StageRecorder()
+    with recording(recorder):
+        try:
+            last_external_id = get_checkpoint(db, source)
+            plugin = get_source(source)
+            # File sources resume at the saved byte offset; each chunk carries
+            # the position after its last row.
+            chunks = plugin.chunks(
+                last_external_id, get_file_position(db, source), chunk_size or settings.etl_chunk_size, tail
+            )
 
+            for chunk in recorder.timed_iter("extract", chunks, size=len):
+                raw_ids, unified, skipped = plugin.process_chunk(db, chunk)
+                with stage("upsert", len(unified)):
+                    upsert_unified_records(db, unified, run, history=plugin.history)
+                with stage("commit", len(chunk)):
+                    if raw_ids:
+                        last_external_id = max(raw_ids)
+                    update_checkpoint(db, source, last_external_id, chunk.position)
+                    processed = len(unified) + skipped
+                    run.records_processed = (run.records_processed or 0) + processed
+                    run.records_changed = (run.records_changed or 0) + len(unified)
+                    run.records_skipped = (run.records_skipped or 0) + skipped
+                    record_progress(db, source, processed)
+                    commit_run(db, source)
+
+            update_checkpoint(db, source, last_external_id, chunks.position)
+            run.status = "SUCCESS"
+            run.finished_at = datetime.utcnow()
+            record_run_finished(db, run)
+            save_stages(db, run, recorder)
+            commit_run(db, source)
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            run.status = "FAILURE"
+            run.error_message = str(exc)
+            run.finished_at = datetime.utcnow()
+            record_run_finished(db, run)
+            save_stages(db, run, recorder)
+            commit_run(db, source)
+            raise
+
+
+def run_source_isolated(source: str, tail: bool = False) -> str | None:
+    """Run ``source`` on its own session; return the error message on failure.
+
+    The source's EtlRun and Checkpoint are committed independently, so a
+    failure is recorded on its own run without touching the other sources.
+    """
+    from app.db.session import SessionLocal
 
-def main():
-    Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
-        for source in SOURCES:
-            run_for_source(db, source)
+        run_for_source(db, source, tail=tail)
+        return None
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("ETL source %s failed: %s", source, exc)
+        return str(exc)
     finally:
         db.close()
 
 
+def main(
+    sources: Sequence[str] | None = None,
+    parallel: bool | None = None,
+    workers: int | None = None,
+) -> dict[str, str]:
+    """Run ``sources`` (default: all) and return a mapping of failed source -> error.
+
+    In parallel mode every source runs in a worker thread with its own
+    session; otherwise they run one after another.  SQLite always runs
+    serially, as concurrent writers fail with "database is locked".  Either
+    way a failing source no longer stops the remaining ones.
+    """
+    from app.db.session import engine
+
+    ensure_schema(engine)
+    sources = source_names() if sources is None else sources
+    parallel = settings.etl_parallel if parallel is None else parallel
+    workers = workers or settings.etl_max_workers
+    if parallel and engine.dialect.name == "sqlite":
+        logger.warning("ETL_PARALLEL is ignored on SQLite, which allows a single writer; running sources serially")
+        parallel = False
+
+    if parallel and len(sources) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(sources))) as pool:
+            errors = dict(zip(sources, pool.map(run_source_isolated, sources)))
+    else:
+        errors = {source: run_source_isolated(source) for source in sources}
+
+    return {source: err for source, err in errors.items() if err is not None}
+
+
+def watch(
+    sources: Sequence[str] | None = None,
+    poll_seconds: float | None = None,
+    stop: threading.Event | None = None,
+) -> None:
+    """Run each file source whenever its file changes until ``stop`` is set.
+
+    Files are polled with ``os.stat`` every ``poll_seconds``; a run starts on
+    the first poll and then whenever the inode, size or mtime moves.  With
+    byte-offset checkpoints a run after an append only reads the new bytes.
+    """
+    from app.db.session import engine
+
+    ensure_schema(engine)
+    sources = file_source_names() if sources is None else sources
+    stop = stop or threading.Event()
+    poll_seconds = poll_seconds or settings.etl_watch_poll_seconds
+    seen: dict[str, tuple[int, int, float]] = {}
+    while not stop.is_set():
+        for source in sources:
+            signature = file_signature(get_source(source).path)
+            if signature is None or signature == seen.get(source):
+                continue
+            # Record before running so writes during the run trigger another one.
+            seen[source] = signature
+            run_source_isolated(source, tail=True)
+        stop.wait(poll_seconds)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline once.")
+    parser.add_argument("--source", action="append", choices=source_names(), help="Source to run (repeatable); defaults to all")
+    parser.add_argument("--parallel", action=argparse.BooleanOptionalAction, default=None, help="Run sources concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="Worker count for --parallel")
+    parser.add_argument("--watch", action="store_true", help="Keep running CSV sources whenever their files change")
+    parser.add_argument("--poll-seconds", type=float, default=None, help="File poll interval for --watch")
+    args = parser.parse_args(argv)
+    if args.watch and set(args.source or ()) - set(file_source_names()):
+        parser.error(f"--watch only supports file sources: {', '.join(file_source_names())}")
+    return args
+
+
 if __name__ == "__main__":
     # simple one-shot run; Docker etl service will execute this
-    main()
+    args = parse_args()
+    if args.watch:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        try:
+            watch(args.source, args.poll_seconds, stop)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    failures = main(args.source, parallel=args.parallel, workers=args.workers)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,40 @@
+"""Stable identifiers and content hashes for source records.
+
+Python's built-in ``hash()`` is salted per process, so anything persisted
+must be derived from a cryptographic digest instead.
+"""
+import hashlib
+import json
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def stable_external_id(key: str, modulo: int = 10 ** 8) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % modulo
+
+
+def content_hash(payload: Mapping[str, Any]) -> str:
+    """SHA-256 of the payload's canonical JSON form (sorted keys, no whitespace)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def stored_hashes(db: Session, source: str, external_ids: Iterable[str]) -> dict[str, str | None]:
+    """Return the content hash currently stored on ``unified_records`` per external id."""
+    table = models.UnifiedRecord.__table__
+    ids = list(set(external_ids))
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(table.c.external_id, table.c.content_hash).where(
+            table.c.source == source,
+            table.c.external_id.in_(ids),
+        )
+    )
+    return {row.external_id: row.content_hash for row in rows}
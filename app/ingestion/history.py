@@ -0,0 +1,260 @@
+"""Append-only value history and incrementally maintained OHLC rollups.
+
+Every batch written to ``unified_records`` is also appended to
+``unified_history`` (duplicates of an already stored point are ignored) and
+only the newly stored points are merged into the 1m/1h/1d rows of
+``unified_rollups``.  Rollups therefore never rescan history: on PostgreSQL
+and SQLite each batch is folded into its buckets by one ``INSERT ... ON
+CONFLICT DO UPDATE``; other databases read just the rollup rows for the
+buckets touched by the batch.
+
+Timestamps are compared as naive UTC, which is how SQLite stores them;
+naive source timestamps are taken to be UTC already.
+"""
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.types import naive_utc
+
+EPOCH = datetime(1970, 1, 1)
+
+INTERVALS = ("1m", "1h", "1d")
+
+PointKey = tuple[str, str, datetime]
+
+
+def day_bucket(ts: datetime) -> int:
+    return (naive_utc(ts) - EPOCH).days
+
+
+def bucket_start(ts: datetime, interval: str) -> datetime:
+    ts = naive_utc(ts)
+    if interval == "1m":
+        return ts.replace(second=0, microsecond=0)
+    if interval == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if interval == "1d":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup interval {interval}")
+
+
+def _dialect_name(db: Session | Connection) -> str:
+    bind = db if isinstance(db, Connection) else db.get_bind()
+    return bind.dialect.name
+
+
+def _collect_points(rows: Iterable[Mapping[str, Any]]) -> dict[PointKey, dict[str, Any]]:
+    points: dict[PointKey, dict[str, Any]] = {}
+    for row in rows:
+        ts = row.get("timestamp")
+        if ts is None:
+            continue
+        ts = naive_utc(ts)
+        points[(row["source"], row["external_id"], ts)] = {
+            "source": row["source"],
+            "external_id": row["external_id"],
+            "timestamp": ts,
+            "value": row.get("value"),
+            "bucket": day_bucket(ts),
+        }
+    return points
+
+
+def _group_by_source(keys: Iterable[PointKey]) -> dict[str, tuple[set[str], datetime, datetime]]:
+    grouped: dict[str, tuple[set[str], datetime, datetime]] = {}
+    for source, external_id, ts in keys:
+        ids, lo, hi = grouped.get(source, (set(), ts, ts))
+        ids.add(external_id)
+        grouped[source] = (ids, min(lo, ts), max(hi, ts))
+    return grouped
+
+
+def _existing_points(db: Session | Connection, keys: Iterable[PointKey]) -> set[PointKey]:
+    table = models.UnifiedHistory.__table__
+    found: set[PointKey] = set()
+    for source, (ids, lo, hi) in _group_by_source(keys).items():
+        result = db.execute(
+            select(table.c.source, table.c.external_id, table.c.timestamp).where(
+                table.c.source == source,
+                table.c.external_id.in_(ids),
+                table.c.timestamp.between(lo, hi),
+            )
+        )
+        found.update((r.source, r.external_id, naive_utc(r.timestamp)) for r in result)
+    return found
+
+
+def _insert_points(db: Session | Connection, points: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Insert ``points`` and return the ones this call actually stored."""
+    table = models.UnifiedHistory.__table__
+    dialect = _dialect_name(db)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # No upsert support: a concurrent duplicate fails the insert instead.
+        db.execute(insert(table), points)
+        return points
+    # A concurrent writer may have stored some of the same points since we
+    # looked; RETURNING reports only the rows this statement inserted, so
+    # those points are not merged into the rollups twice.
+    stmt = (
+        dialect_insert(table)
+        .values(points)
+        .on_conflict_do_nothing(index_elements=["source", "external_id", "timestamp"])
+        .returning(table.c.source, table.c.external_id, table.c.timestamp)
+    )
+    stored = {(r.source, r.external_id, naive_utc(r.timestamp)) for r in db.execute(stmt)}
+    return [p for p in points if (p["source"], p["external_id"], p["timestamp"]) in stored]
+
+
+def _merge(agg: dict[str, Any] | None, points: list[dict[str, Any]]) -> dict[str, Any]:
+    points = sorted(points, key=lambda p: p["timestamp"])
+    first, last = points[0], points[-1]
+    values = [p["value"] for p in points]
+    if agg is None:
+        return {
+            "open": first["value"],
+            "open_at": first["timestamp"],
+            "close": last["value"],
+            "close_at": last["timestamp"],
+            "high": max(values),
+            "low": min(values),
+            "count": len(points),
+        }
+    merged = dict(agg)
+    if first["timestamp"] < naive_utc(agg["open_at"]):
+        merged["open"], merged["open_at"] = first["value"], first["timestamp"]
+    if last["timestamp"] > naive_utc(agg["close_at"]):
+        merged["close"], merged["close_at"] = last["value"], last["timestamp"]
+    merged["high"] = max(values + [agg["high"]])
+    merged["low"] = min(values + [agg["low"]])
+    merged["count"] = agg["count"] + len(points)
+    return merged
+
+
+def _upsert_rollups(db: Session | Connection, dialect: str, rows: list[dict[str, Any]]) -> None:
+    """Insert bucket aggregates, merging into the stored row when the bucket already exists.
+
+    The merge happens in the ``ON CONFLICT DO UPDATE``, under the row lock, so
+    concurrent writers touching the same bucket neither fail nor lose points.
+    """
+    table = models.UnifiedRollup.__table__
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table)
+    new = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "external_id", "interval", "bucket_start"],
+        set_={
+            "open": case((new.open_at < table.c.open_at, new.open), else_=table.c.open),
+            "open_at": case((new.open_at < table.c.open_at, new.open_at), else_=table.c.open_at),
+            "close": case((new.close_at > table.c.close_at, new.close), else_=table.c.close),
+            "close_at": case((new.close_at > table.c.close_at, new.close_at), else_=table.c.close_at),
+            "high": case((new.high > table.c.high, new.high), else_=table.c.high),
+            "low": case((new.low < table.c.low, new.low), else_=table.c.low),
+            "count": table.c.count + new.count,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def _merge_rollups(db: Session | Connection, points: list[dict[str, Any]]) -> None:
+    table = models.UnifiedRollup.__table__
+    points = [p for p in points if p["value"] is not None]
+    if not points:
+        return
+
+    dialect = _dialect_name(db)
+    for interval in INTERVALS:
+        groups: dict[PointKey, list[dict[str, Any]]] = {}
+        for point in points:
+            key = (point["source"], point["external_id"], bucket_start(point["timestamp"], interval))
+            groups.setdefault(key, []).append(point)
+
+        if dialect in ("postgresql", "sqlite"):
+            _upsert_rollups(db, dialect, [
+                {"source": source, "external_id": external_id, "interval": interval, "bucket_start": start,
+                 **_merge(None, group)}
+                for (source, external_id, start), group in groups.items()
+            ])
+            continue
+
+        existing: dict[PointKey, dict[str, Any]] = {}
+        for source, (ids, lo, hi) in _group_by_source(groups).items():
+            result = db.execute(
+                select(table).where(
+                    table.c.interval == interval,
+                    table.c.source == source,
+                    table.c.external_id.in_(ids),
+                    table.c.bucket_start.between(lo, hi),
+                )
+            )
+            for row in result.mappings():
+                existing[(row["source"], row["external_id"], naive_utc(row["bucket_start"]))] = dict(row)
+
+        inserts, updates = [], []
+        for key, group in groups.items():
+            current = existing.get(key)
+            merged = _merge(current, group)
+            if current is None:
+                source, external_id, start = key
+                inserts.append(
+                    {"source": source, "external_id": external_id, "interval": interval, "bucket_start": start, **merged}
+                )
+            else:
+                updates.append({f"b_{k}": v for k, v in merged.items()} | {"b_id": current["id"]})
+
+        if inserts:
+            db.execute(insert(table), inserts)
+        if updates:
+            columns = ("open", "open_at", "close", "close_at", "high", "low", "count")
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values({col: bindparam(f"b_{col}") for col in columns})
+            )
+            db.execute(stmt, updates)
+
+
+def append_history(db: Session | Connection, rows: Iterable[Mapping[str, Any]]) -> int:
+    """Append unified ``rows`` to history and fold new points into the rollups.
+
+    Returns the number of points that were not already stored.
+    """
+    points = _collect_points(rows)
+    if not points:
+        return 0
+    existing = _existing_points(db, points)
+    new_points = [point for key, point in points.items() if key not in existing]
+    if new_points:
+        new_points = _insert_points(db, new_points)
+        _merge_rollups(db, new_points)
+    return len(new_points)
+
+
+def backfill_history_batch(conn: Connection, after_id: int, batch_size: int = 5000) -> int | None:
+    """Seed history from up to ``batch_size`` ``unified_records`` rows with ids above ``after_id``.
+
+    Returns the last id handled, or ``None`` once there are no rows left.
+    """
+    table = models.UnifiedRecord.__table__
+    rows = conn.execute(
+        select(table.c.id, table.c.source, table.c.external_id, table.c.value, table.c.timestamp)
+        .where(table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return None
+    append_history(conn, rows)
+    return rows[-1]["id"]
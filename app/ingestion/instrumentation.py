@@ -0,0 +1,144 @@
+"""Per-stage timing and counters for ETL runs.
+
+``run_for_source`` activates a :class:`StageRecorder` for the duration of a
+run; code inside the run wraps its work in ``stage("name")`` blocks.  While a
+stage is active every SQL statement executed on any engine in the same thread
+(or task) is counted against it, and readers report consumed bytes through
+:func:`record_bytes`.
+"""
+import io
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageStats:
+    wall_seconds: float = 0.0
+    rows: int = 0
+    bytes_read: int = 0
+    statements: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+class StageRecorder:
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self._active: list[StageStats] = []
+
+    def get(self, name: str) -> StageStats:
+        return self.stages.setdefault(name, StageStats())
+
+    @property
+    def active(self) -> StageStats | None:
+        return self._active[-1] if self._active else None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[StageStats]:
+        stats = self.get(name)
+        stats.rows += rows
+        self._active.append(stats)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds += time.perf_counter() - start
+            self._active.pop()
+
+    def timed_iter(
+        self, name: str, items: Iterable[T], size: Callable[[T], int] | None = None
+    ) -> Iterator[T]:
+        """Iterate ``items``, charging time spent producing them to ``name``.
+
+        Each item counts as one row unless ``size`` says how many it holds.
+        """
+        it = iter(items)
+        while True:
+            with self.stage(name) as stats:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                stats.rows += size(item) if size else 1
+            yield item
+
+
+_current: ContextVar[StageRecorder | None] = ContextVar("etl_stage_recorder", default=None)
+
+
+@contextmanager
+def recording(recorder: StageRecorder) -> Iterator[StageRecorder]:
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str, rows: int = 0) -> Iterator[StageStats | None]:
+    """Time a block against the active recorder; a no-op outside a run."""
+    recorder = _current.get()
+    if recorder is None:
+        yield None
+        return
+    with recorder.stage(name, rows) as stats:
+        yield stats
+
+
+def record_bytes(n: int) -> None:
+    recorder = _current.get()
+    if recorder is not None and recorder.active is not None:
+        recorder.active.bytes_read += n
+
+
+class _CountingRaw(io.RawIOBase):
+    def __init__(self, raw: io.RawIOBase):
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def readinto(self, buffer) -> int | None:
+        n = self._raw.readinto(buffer)
+        if n:
+            record_bytes(n)
+        return n
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def open_binary_counted(path: Path) -> io.BufferedReader:
+    """Open ``path`` for byte-level reading, reporting bytes read to the active stage."""
+    raw = open(path, "rb", buffering=0)  # noqa: SIM115 - closed by the wrapper
+    return io.BufferedReader(_CountingRaw(raw))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current.get()
+    if recorder is not None and recorder.active is not None:
+        recorder.active.statements += 1
@@ -0,0 +1,101 @@
+"""Bulk loading of raw payload rows, bypassing the ORM.
+
+On PostgreSQL a batch is written with ``COPY <table> (...) FROM STDIN`` in
+CSV format, streamed from an in-memory buffer through the DBAPI cursor of
+the session's own connection, so it commits or rolls back with the rest of
+the chunk.  Everywhere else (and when ``RAW_LOAD_METHOD=executemany``) the
+batch is a single Core ``INSERT`` executed with many parameter sets.  Either
+way there are no ORM objects, identity-map entries or per-row flushes.
+
+COPY is told to read ``\\N`` as NULL and ``None`` is written that way.  With
+COPY's default an unquoted empty field is NULL too, so ``''`` would load as
+NULL while the ``INSERT`` path stores ``''``.
+"""
+from collections.abc import Mapping, Sequence
+from typing import Any, Literal
+import csv
+import io
+import json
+
+from sqlalchemy import JSON, Table, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+LoadMethod = Literal["auto", "copy", "executemany"]
+
+NULL_MARKER = "\\N"
+
+
+def _connection(db: Session | Connection) -> Connection:
+    return db if isinstance(db, Connection) else db.connection()
+
+
+def resolve_method(conn: Connection, method: LoadMethod | None = None) -> str:
+    method = method or settings.raw_load_method
+    if method == "auto":
+        return "copy" if conn.dialect.name == "postgresql" else "executemany"
+    if method == "copy" and conn.dialect.name != "postgresql":
+        raise ValueError(f"COPY is not supported on {conn.dialect.name}")
+    return method
+
+
+def _copy_value(value: Any, is_json: bool) -> Any:
+    if value is None:
+        return NULL_MARKER
+    if is_json:
+        return json.dumps(value, separators=(",", ":"), default=str)
+    if value == NULL_MARKER:
+        raise ValueError(f"{NULL_MARKER!r} cannot be loaded with COPY; use RAW_LOAD_METHOD=executemany")
+    return value
+
+
+def copy_buffer(table: Table, columns: Sequence[str], rows: Sequence[Mapping[str, Any]]) -> io.StringIO:
+    """Render ``rows`` as COPY CSV input; JSON columns are serialized, ``None`` becomes :data:`NULL_MARKER`."""
+    json_columns = {name for name in columns if isinstance(table.c[name].type, JSON)}
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    for row in rows:
+        writer.writerow(_copy_value(row.get(name), name in json_columns) for name in columns)
+    buf.seek(0)
+    return buf
+
+
+def copy_sql(table: Table, columns: Sequence[str]) -> str:
+    return f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')"
+
+
+def _copy(conn: Connection, table: Table, rows: Sequence[Mapping[str, Any]]) -> None:
+    columns = list(rows[0])
+    sql = copy_sql(table, columns)
+    buf = copy_buffer(table, columns, rows)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buf)
+        elif hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(sql) as copy:
+                while data := buf.read(1 << 16):
+                    copy.write(data)
+        else:
+            raise RuntimeError(f"{conn.dialect.driver} does not support COPY FROM STDIN")
+    finally:
+        cursor.close()
+
+
+def load_raw(
+    db: Session | Connection,
+    table: Table,
+    rows: Sequence[Mapping[str, Any]],
+    method: LoadMethod | None = None,
+) -> int:
+    """Insert ``rows`` (all with the same keys) into ``table``; return the row count."""
+    if not rows:
+        return 0
+    conn = _connection(db)
+    if resolve_method(conn, method) == "copy":
+        _copy(conn, table, rows)
+    else:
+        conn.execute(insert(table), list(rows))
+    return len(rows)
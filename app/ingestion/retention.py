@@ -0,0 +1,240 @@
+"""Retention for the raw payload tables: archive, prune and replay.
+
+``prune`` walks each raw table oldest first, taking at most
+RAW_RETENTION_BATCH_SIZE rows older than the source's TTL per transaction.
+Every batch is written to a compressed columnar file under
+``RAW_ARCHIVE_DIR/source=<source>/day=<YYYY-MM-DD>/`` before it is deleted
+by primary key, so no statement holds locks for longer than one batch and a
+crash between the two steps only rewrites the same file on the next run.
+
+Archives are zstd Parquet when pyarrow is installed and gzip'd column JSON
+otherwise; ``replay`` reads either, re-runs the source transform and writes
+the values back through the normal upsert (older values only go to
+``unified_history``, never over a newer ``unified_records`` row).
+
+    python -m app.ingestion.retention prune [--source api]
+    python -m app.ingestion.retention replay --source api [--since 2024-12-01] [--until 2024-12-31]
+"""
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+import argparse
+import gzip
+import importlib.util
+import json
+import logging
+import os
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.types import naive_utc
+from app.ingestion.history import append_history
+from app.ingestion.sources import Unified, get_source, source_names
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ("id", "external_id", "received_at", "payload")
+ARCHIVE_SUFFIXES = (".parquet", ".json.gz")
+
+
+@dataclass
+class PruneResult:
+    archived: int = 0
+    files: list[Path] = field(default_factory=list)
+
+
+def archive_root() -> Path:
+    return Path(settings.raw_archive_dir)
+
+
+def partition_dir(root: Path, source: str, day: date) -> Path:
+    return root / f"source={source}" / f"day={day.isoformat()}"
+
+
+def _has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def write_archive(stem: Path, columns: dict[str, list[Any]]) -> Path:
+    """Write ``columns`` next to ``stem`` atomically and return the file path."""
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    if _has_pyarrow():
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = stem.with_name(stem.name + ".parquet")
+        tmp = path.with_name(path.name + ".tmp")
+        pq.write_table(pa.table(columns), tmp, compression="zstd")
+    else:
+        logger.warning("pyarrow is not installed; archiving %s as gzip'd JSON instead of Parquet", stem)
+        path = stem.with_name(stem.name + ".json.gz")
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(columns, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def read_archive(path: Path) -> dict[str, list[Any]]:
+    if path.name.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError(f"Reading {path} requires pyarrow (pip install pyarrow)") from exc
+        return pq.read_table(path).to_pydict()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_archives(
+    root: Path, source: str, since: date | None = None, until: date | None = None
+) -> Iterator[Path]:
+    """Yield ``source``'s archive files oldest first, limited to ``since``..``until``."""
+    base = root / f"source={source}"
+    if not base.exists():
+        return
+    for day_dir in sorted(base.glob("day=*")):
+        day = date.fromisoformat(day_dir.name.removeprefix("day="))
+        if (since and day < since) or (until and day > until):
+            continue
+        for path in sorted(day_dir.iterdir()):
+            if path.name.endswith(ARCHIVE_SUFFIXES):
+                yield path
+
+
+def _archive_batch(root: Path, source: str, rows) -> list[Path]:
+    by_day: dict[date, dict[str, list[Any]]] = {}
+    for row in rows:
+        received_at = naive_utc(row.received_at)
+        columns = by_day.setdefault(received_at.date(), {col: [] for col in ARCHIVE_COLUMNS})
+        columns["id"].append(row.id)
+        columns["external_id"].append(row.external_id)
+        columns["received_at"].append(received_at.isoformat())
+        columns["payload"].append(json.dumps(row.payload, sort_keys=True))
+    paths = []
+    for day, columns in sorted(by_day.items()):
+        ids = columns["id"]
+        stem = partition_dir(root, source, day) / f"part-{min(ids):012d}-{max(ids):012d}"
+        paths.append(write_archive(stem, columns))
+    return paths
+
+
+def prune_source(
+    db: Session,
+    source: str,
+    now: datetime | None = None,
+    root: Path | None = None,
+    batch_size: int | None = None,
+) -> PruneResult:
+    """Archive and delete ``source``'s raw rows older than its TTL, batch by batch."""
+    result = PruneResult()
+    plugin = get_source(source)
+    days = plugin.retention_days
+    if days <= 0:
+        return result
+    table = plugin.raw_model
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+    root = root or archive_root()
+    size = batch_size or settings.raw_retention_batch_size
+
+    while True:
+        rows = db.execute(
+            select(table.id, table.external_id, table.received_at, table.payload)
+            .where(table.received_at < cutoff, *plugin.raw_filter())
+            .order_by(table.received_at, table.id)
+            .limit(size)
+        ).all()
+        if not rows:
+            return result
+        result.files.extend(_archive_batch(root, source, rows))
+        db.execute(delete(table).where(table.id.in_([row.id for row in rows])))
+        db.commit()
+        result.archived += len(rows)
+
+
+def _stored_timestamps(db: Session, source: str, external_ids: set[str]) -> dict[str, datetime | None]:
+    table = models.UnifiedRecord
+    result = db.execute(
+        select(table.external_id, table.timestamp).where(
+            table.source == source, table.external_id.in_(external_ids)
+        )
+    )
+    return {external_id: ts for external_id, ts in result}
+
+
+def replay_rows(db: Session, unified: Unified, history: bool = True) -> int:
+    """Write replayed records without moving ``unified_records`` back in time.
+
+    With ``history`` the records older than the stored ones still land in
+    ``unified_history``.
+    """
+    from app.ingestion.etl_runner import upsert_unified_records
+
+    rows = [rec if isinstance(rec, Mapping) else rec.model_dump() for rec in unified]
+    if not rows:
+        return 0
+    current: dict[tuple[str, str], datetime | None] = {}
+    for source in {row["source"] for row in rows}:
+        ids = {row["external_id"] for row in rows if row["source"] == source}
+        current.update(((source, ext), ts) for ext, ts in _stored_timestamps(db, source, ids).items())
+
+    fresh, stale = [], []
+    for row in rows:
+        stored = current.get((row["source"], row["external_id"]))
+        newer = stored is None or row["timestamp"] is None or naive_utc(row["timestamp"]) >= naive_utc(stored)
+        (fresh if newer else stale).append(row)
+    upsert_unified_records(db, fresh, history=history)
+    if stale and history and settings.history_enabled:
+        append_history(db, stale)
+    return len(rows)
+
+
+def replay_source(
+    db: Session,
+    source: str,
+    since: date | None = None,
+    until: date | None = None,
+    root: Path | None = None,
+) -> int:
+    """Re-ingest ``source``'s archived raw rows, committing once per archive file."""
+    from app.ingestion.etl_runner import commit_run
+
+    plugin = get_source(source)
+    replayed = 0
+    for path in iter_archives(root or archive_root(), source, since, until):
+        payloads = [json.loads(payload) for payload in read_archive(path)["payload"]]
+        replayed += replay_rows(db, plugin.replay_transform(payloads), history=plugin.history)
+        commit_run(db, source)
+    return replayed
+
+
+def main(argv=None) -> None:
+    from app.db.migrations import ensure_schema
+    from app.db.session import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Archive, prune and replay raw payload rows.")
+    parser.add_argument("command", choices=("prune", "replay"))
+    parser.add_argument("--source", choices=source_names(), action="append", help="Repeatable; all by default")
+    parser.add_argument("--since", type=date.fromisoformat, help="First archive day to replay (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Last archive day to replay (YYYY-MM-DD)")
+    parser.add_argument("--archive-dir", type=Path, help="Defaults to RAW_ARCHIVE_DIR")
+    args = parser.parse_args(argv)
+
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        for source in args.source or source_names():
+            if args.command == "prune":
+                result = prune_source(db, source, root=args.archive_dir)
+                print(f"{source}: archived and deleted {result.archived} rows into {len(result.files)} files")
+            else:
+                count = replay_source(db, source, args.since, args.until, root=args.archive_dir)
+                print(f"{source}: replayed {count} records")
+
+
+if __name__ == "__main__":
+    main()
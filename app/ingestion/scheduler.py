@@ -0,0 +1,133 @@
+"""Resident ETL scheduler.
+
+Keeps one process (and so one warm engine pool and CoinGecko client) alive
+and runs every source on its own ETL_INTERVAL_SECONDS_<SOURCE> cadence, each
+interval stretched or shrunk by up to ETL_INTERVAL_JITTER so sources do not
+fire in lockstep.  A source is never started while its previous run is still
+in flight; if a run overruns its interval the next one starts as soon as it
+finishes.  SIGTERM/SIGINT stop new runs and wait for the in-flight ones,
+which commit per chunk, so a forced kill after the grace period loses at
+most the chunk being written.
+
+    python -m app.ingestion.scheduler [--source api --source csv1]
+"""
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import random
+import signal
+import threading
+import time
+
+from app.core.config import settings
+from app.ingestion.etl_runner import run_source_isolated
+from app.ingestion.sources import get_source, source_names
+
+
+def interval_for(source: str) -> float:
+    return get_source(source).interval_seconds
+
+
+class Scheduler:
+    def __init__(
+        self,
+        sources: Sequence[str] | None = None,
+        intervals: dict[str, float] | None = None,
+        jitter: float | None = None,
+        run: Callable[[str], str | None] = run_source_isolated,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ):
+        sources = source_names() if sources is None else sources
+        self.intervals = {source: (intervals or {}).get(source) or interval_for(source) for source in sources}
+        self.jitter = settings.etl_interval_jitter if jitter is None else jitter
+        self.run = run
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="etl")
+        self._lock = threading.Lock()
+        self._running: set[str] = set()
+        self._next_due = {source: clock() for source in sources}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def delay(self, source: str) -> float:
+        return self.intervals[source] * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def tick(self) -> list[str]:
+        """Start every due source that is not already running; return them."""
+        now = self.clock()
+        started = []
+        with self._lock:
+            for source, due in self._next_due.items():
+                if due > now or source in self._running or self._stopping.is_set():
+                    continue
+                self._running.add(source)
+                self._next_due[source] = now + self.delay(source)
+                self.executor.submit(self._run, source)
+                started.append(source)
+        return started
+
+    def _run(self, source: str) -> None:
+        try:
+            started = time.perf_counter()
+            error = self.run(source)
+            status = f"failed: {error}" if error else "succeeded"
+            print(f"ETL source {source} {status} in {time.perf_counter() - started:.1f}s")
+        finally:
+            with self._lock:
+                self._running.discard(source)
+            self._wakeup.set()
+
+    def seconds_until_due(self) -> float | None:
+        with self._lock:
+            waiting = [due for source, due in self._next_due.items() if source not in self._running]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - self.clock())
+
+    def running(self) -> set[str]:
+        with self._lock:
+            return set(self._running)
+
+    def run_forever(self) -> None:
+        while not self._stopping.is_set():
+            # Clear before ticking so a run finishing mid-tick still wakes us.
+            self._wakeup.clear()
+            self.tick()
+            self._wakeup.wait(self.seconds_until_due())
+        self.executor.shutdown(wait=True)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+
+def main(sources: Sequence[str] | None = None) -> None:
+    from app.db.migrations import ensure_schema
+    from app.db.session import engine
+    from app.ingestion.api_source import close_fetcher
+
+    ensure_schema(engine)
+    scheduler = Scheduler(sources)
+
+    def handle_signal(signum, frame):
+        print(f"Received {signal.Signals(signum).name}; waiting for running sources: {sorted(scheduler.running())}")
+        scheduler.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    intervals = ", ".join(f"{source} every {interval:g}s" for source, interval in scheduler.intervals.items())
+    print(f"ETL scheduler started: {intervals}")
+    try:
+        scheduler.run_forever()
+    finally:
+        close_fetcher()
+        engine.dispose()
+    print("ETL scheduler stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ETL sources on their configured intervals.")
+    parser.add_argument("--source", action="append", choices=source_names(), help="Source to schedule (repeatable); defaults to all")
+    main(parser.parse_args().source)
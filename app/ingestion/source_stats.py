@@ -0,0 +1,141 @@
+"""Incrementally maintained ETL statistics (``etl_source_stats``).
+
+``run_for_source`` calls :func:`record_run_started`, :func:`record_progress`
+and :func:`record_run_finished` inside the same transactions that write the
+corresponding ``EtlRun`` changes, so the summary always agrees with the run
+history.  The counters are incremented in SQL (``col = col + n``) rather than
+read and written back, so concurrent runs of one source never lose a count.
+:func:`rebuild_source_stats` recomputes it from ``etl_runs``.
+"""
+from datetime import datetime
+
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.types import naive_utc
+
+
+def _stats_row(db: Session, source: str) -> models.EtlSourceStats:
+    row = db.get(models.EtlSourceStats, source)
+    if row is None:
+        row = models.EtlSourceStats(source=source, total_runs=0, total_processed=0)
+        db.add(row)
+    return row
+
+
+def run_duration(run: models.EtlRun) -> float | None:
+    started, finished = run.started_at, run.finished_at
+    if started is None or finished is None:
+        return None
+    return (naive_utc(finished) - naive_utc(started)).total_seconds()
+
+
+def _later(current: datetime | None, candidate: datetime | None) -> datetime | None:
+    if current is None:
+        return candidate
+    if candidate is None:
+        return current
+    return candidate if naive_utc(candidate) >= naive_utc(current) else current
+
+
+def _increment(db: Session, source: str, **deltas: int) -> None:
+    """Add ``deltas`` to ``source``'s counters, creating its row if needed."""
+    table = models.EtlSourceStats.__table__
+    counters = {"total_runs": 0, "total_processed": 0} | deltas
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(source=source, **counters)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["source"],
+                set_={col: table.c[col] + stmt.excluded[col] for col in deltas},
+            )
+        )
+        return
+    increments = {col: table.c[col] + n for col, n in deltas.items()}
+    if not db.execute(update(table).where(table.c.source == source).values(increments)).rowcount:
+        db.execute(insert(table).values(source=source, **counters))
+
+
+def record_run_started(db: Session, source: str) -> None:
+    _increment(db, source, total_runs=1)
+
+
+def record_progress(db: Session, source: str, processed: int) -> None:
+    _increment(db, source, total_processed=processed)
+
+
+def record_run_finished(db: Session, run: models.EtlRun) -> None:
+    row = _stats_row(db, run.source)
+    if run.status == "SUCCESS":
+        row.last_success = _later(row.last_success, run.finished_at)
+    elif run.status == "FAILURE":
+        row.last_failure = _later(row.last_failure, run.finished_at)
+    row.last_duration_seconds = run_duration(run)
+
+
+def rebuild_source_stats(db: Session) -> int:
+    """Recompute ``etl_source_stats`` from the full ``etl_runs`` history.
+
+    Returns the number of sources written.  The caller owns the transaction.
+    """
+    aggregates = (
+        db.query(
+            models.EtlRun.source,
+            func.count(models.EtlRun.id).label("total_runs"),
+            func.coalesce(func.sum(models.EtlRun.records_processed), 0).label("total_processed"),
+            func.max(
+                case((models.EtlRun.status == "SUCCESS", models.EtlRun.finished_at))
+            ).label("last_success"),
+            func.max(
+                case((models.EtlRun.status == "FAILURE", models.EtlRun.finished_at))
+            ).label("last_failure"),
+        )
+        .group_by(models.EtlRun.source)
+        .all()
+    )
+
+    db.query(models.EtlSourceStats).delete(synchronize_session=False)
+    for agg in aggregates:
+        last_run = (
+            db.query(models.EtlRun)
+            .filter(models.EtlRun.source == agg.source, models.EtlRun.finished_at.isnot(None))
+            .order_by(models.EtlRun.finished_at.desc())
+            .first()
+        )
+        db.add(
+            models.EtlSourceStats(
+                source=agg.source,
+                total_runs=agg.total_runs,
+                total_processed=int(agg.total_processed or 0),
+                last_success=agg.last_success,
+                last_failure=agg.last_failure,
+                last_duration_seconds=run_duration(last_run) if last_run else None,
+            )
+        )
+    return len(aggregates)
+
+
+def main():
+    from app.db.generation import bump_generation
+    from app.db.migrations import ensure_schema
+    from app.db.session import SessionLocal, engine
+
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_source_stats(db)
+        bump_generation(db, "etl_source_stats")
+        db.commit()
+        print(f"Rebuilt ETL statistics for {count} source(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Source plugins and the registry ``run_for_source`` dispatches through.
+
+A :class:`SourcePlugin` declares how to stream a source's rows, which raw
+table they land in, the integer key used for checkpoints and how a chunk is
+transformed into unified records.  ``chunks`` groups the rows into committed
+chunks; CSV sources hand that to ``app.ingestion.parallel_csv`` when
+ETL_PARSE_MODE=parallel.  Everything else -- chunking, parallel
+runs, checkpoints, stage timings, retention and scheduling -- is shared and
+looks plugins up by name.
+
+The CoinGecko API and the two bundled CSV files are registered here; more
+CSV feeds can be declared with ``CSV_FEEDS`` (a JSON list of column mappings,
+see ``app.core.config.CsvFeed``) and are stored in ``raw_records``.  Code
+plugins call :func:`register`.
+"""
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.config import CsvFeed, settings
+from app.db import models
+from app.ingestion import csv_source1, csv_source2
+from app.ingestion.bulk import Chunk, RowChunks
+from app.ingestion.columnar import ColumnSpec, UnifiedColumns, transform_columns, transform_rows
+from app.ingestion.csv_tail import CsvTail, FilePosition
+from app.ingestion.hashing import content_hash
+from app.ingestion.instrumentation import stage
+from app.ingestion.raw_loader import load_raw
+from app.schemas.unified import UnifiedRecordCreate
+
+Unified = Iterable[UnifiedRecordCreate | Mapping[str, Any]]
+
+
+class SourcePlugin(ABC):
+    """Base class for ETL sources; subclasses implement ``rows``, ``key`` and ``transform``.
+
+    Those are abstract, so a plugin missing one fails when it is instantiated
+    for :func:`register` rather than on its first run.
+    """
+
+    name: str
+    raw_model: type[models.Base]
+    path: Path | None = None
+    # Append this source's values to unified_history and its rollups; off for
+    # the bulk CSV feeds, whose ingest throughput it would halve.
+    history: bool = False
+
+    @abstractmethod
+    def rows(self, last_external_id: int | None, position: FilePosition | None) -> Iterable[dict]:
+        """Stream rows newer than the checkpoint."""
+
+    def chunks(
+        self, last_external_id: int | None, position: FilePosition | None, size: int, tail: bool = False
+    ) -> Iterable[Chunk]:
+        """Rows newer than the checkpoint in ``Chunk`` groups; the result exposes the final ``position``.
+
+        ``tail`` means a writer may still be appending (``--watch``), so file
+        sources leave an unterminated last line for the next run.
+        """
+        return RowChunks(self.rows(last_external_id, position), size)
+
+    @abstractmethod
+    def key(self, row: Mapping[str, Any]) -> int:
+        """Integer id stored on the raw row and used as ``last_external_id``."""
+
+    @abstractmethod
+    def transform(self, rows: list[dict]) -> Unified:
+        """Unified records for a chunk of rows."""
+
+    def replay_transform(self, rows: list[dict]) -> Unified:
+        """Unified records for archived raw rows, as ``process_chunk`` would write them."""
+        return self.transform(rows)
+
+    def raw_values(self, row: dict, key: int) -> dict[str, Any]:
+        return {"external_id": key, "payload": row}
+
+    def raw_filter(self) -> list:
+        """Extra WHERE clauses selecting this source's rows in a shared raw table."""
+        return []
+
+    @property
+    def retention_days(self) -> int:
+        return getattr(settings, f"raw_retention_days_{self.name}")
+
+    @property
+    def interval_seconds(self) -> float:
+        return getattr(settings, f"etl_interval_seconds_{self.name}")
+
+    def store_raw(self, db: Session, rows: list[dict]) -> list[int]:
+        keys = [self.key(row) for row in rows]
+        load_raw(db, self.raw_model.__table__, [self.raw_values(row, key) for row, key in zip(rows, keys)])
+        return keys
+
+    def process_chunk(self, db: Session, chunk: list[dict]) -> tuple[list[int], Unified, int]:
+        """Store ``chunk`` raw and return ``(raw_ids, unified, skipped)``."""
+        with stage("store_raw", len(chunk)):
+            raw_ids = self.store_raw(db, chunk)
+        unified = getattr(chunk, "unified", None)
+        if unified is None:
+            with stage("transform", len(chunk)):
+                unified = self.transform(chunk)
+        return raw_ids, unified, 0
+
+
+class ApiSource(SourcePlugin):
+    name = "api"
+    raw_model = models.RawAPIRecord
+    history = True
+
+    @property
+    def api(self):
+        # Imported on first use: runs of the CSV sources never load httpx.
+        from app.ingestion import api_source
+
+        return api_source
+
+    def rows(self, last_external_id, position):
+        return self.api.iter_api_records(last_external_id)
+
+    def key(self, row):
+        return self.api.api_external_id(row)
+
+    def transform(self, rows):
+        return self.api.transform_api_to_unified(rows)
+
+    def _hashed(self, rows: list[dict], hashes: dict[str, str]) -> list[dict]:
+        return [{**rec.model_dump(), "content_hash": hashes.get(rec.external_id)} for rec in self.transform(rows)]
+
+    def replay_transform(self, rows):
+        # Change detection compares against content_hash, so replayed rows need it too.
+        return self._hashed(rows, {self.api.api_unified_key(row): content_hash(row) for row in rows})
+
+    def process_chunk(self, db, chunk):
+        with stage("change_detection", len(chunk)):
+            changed, hashes = self.api.select_changed_api_records(db, chunk)
+        with stage("store_raw", len(changed)):
+            raw_ids = self.api.store_raw_api(db, changed, hashes)
+        with stage("transform", len(changed)):
+            unified = self._hashed(changed, hashes)
+        return raw_ids, unified, len(chunk) - len(changed)
+
+
+class CsvSource(SourcePlugin):
+    """An append-only CSV file mapped onto the unified columns by ``columns``."""
+
+    def __init__(
+        self,
+        name: str,
+        columns: ColumnSpec,
+        path: Path | Callable[[], Path],
+        raw_model: type[models.Base] = models.RawRecord,
+        retention_days: int | None = None,
+        interval_seconds: float | None = None,
+    ):
+        self.name = name
+        self.columns = columns
+        self.raw_model = raw_model
+        self._path = path
+        self._retention_days = retention_days
+        self._interval_seconds = interval_seconds
+
+    @classmethod
+    def from_config(cls, feed: CsvFeed) -> "CsvSource":
+        columns = ColumnSpec(
+            source=feed.name,
+            id_column=feed.id_column,
+            name_column=feed.name_column,
+            value_column=feed.value_column,
+            timestamp_column=feed.timestamp_column,
+        )
+        return cls(feed.name, columns, Path(feed.path), retention_days=feed.retention_days,
+                   interval_seconds=feed.interval_seconds)
+
+    @property
+    def path(self) -> Path:
+        return self._path() if callable(self._path) else self._path
+
+    @property
+    def retention_days(self) -> int:
+        return super().retention_days if self._retention_days is None else self._retention_days
+
+    @property
+    def interval_seconds(self) -> float:
+        return super().interval_seconds if self._interval_seconds is None else self._interval_seconds
+
+    def rows(self, last_external_id, position):
+        return CsvTail(self.path, self.columns.id_column, last_external_id, position)
+
+    def chunks(self, last_external_id, position, size, tail=False):
+        if settings.etl_parse_mode == "parallel":
+            from app.ingestion.parallel_csv import ParallelCsvChunks
+
+            return ParallelCsvChunks(self.path, self.columns, last_external_id, position, hold_partial=tail)
+        tail_rows = CsvTail(self.path, self.columns.id_column, last_external_id, position, hold_partial=tail)
+        return RowChunks(tail_rows, size)
+
+    def key(self, row):
+        return int(row[self.columns.id_column])
+
+    def transform(self, rows) -> list[UnifiedRecordCreate] | UnifiedColumns:
+        if settings.etl_transform_mode == "columnar":
+            return transform_columns(rows, self.columns)
+        return transform_rows(rows, self.columns)
+
+    def raw_values(self, row, key):
+        values = super().raw_values(row, key)
+        if self.raw_model is models.RawRecord:
+            values["source"] = self.name
+        return values
+
+    def raw_filter(self):
+        if self.raw_model is models.RawRecord:
+            return [models.RawRecord.source == self.name]
+        return []
+
+
+_registry: dict[str, SourcePlugin] = {}
+_feeds_lock = threading.Lock()
+_feeds_registered = False
+
+
+def register(plugin: SourcePlugin) -> SourcePlugin:
+    if plugin.name in _registry:
+        raise ValueError(f"Source {plugin.name} is already registered")
+    _registry[plugin.name] = plugin
+    return plugin
+
+
+def _plugins() -> dict[str, SourcePlugin]:
+    """The registry, with ``CSV_FEEDS`` registered the first time it is read.
+
+    Deferring the feeds keeps settings (and ``.env``) out of import time.
+    """
+    global _feeds_registered
+    with _feeds_lock:
+        if not _feeds_registered:
+            _feeds_registered = True
+            for feed in settings.csv_feeds:
+                register(CsvSource.from_config(feed))
+    return _registry
+
+
+def get_source(name: str) -> SourcePlugin:
+    try:
+        return _plugins()[name]
+    except KeyError:
+        raise ValueError(f"Unknown source {name}") from None
+
+
+def source_names() -> tuple[str, ...]:
+    return tuple(_plugins())
+
+
+def file_source_names() -> tuple[str, ...]:
+    return tuple(name for name, plugin in _plugins().items() if plugin.path is not None)
+
+
+register(ApiSource())
+register(CsvSource("csv1", csv_source1.COLUMNS, lambda: csv_source1.DATA_PATH, models.RawCSVRecord))
+register(CsvSource("csv2", csv_source2.COLUMNS, lambda: csv_source2.DATA_PATH, models.RawCSV2Record))
@@ -1,11 +1,14 @@
+from functools import lru_cache
+from typing import Any
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.session import Base, engine
-from app.api.routes import data, health, stats
+from app.core.config import settings
+from app.api.routes import data, export, health, metrics, series, stats
 
 
-def create_app() -> FastAPI:
+def create_app(async_db: bool | None = None) -> FastAPI:
     app = FastAPI(title="Backend & ETL System", version="1.0.0")
 
     app.add_middleware(
@@ -16,19 +19,34 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    app.include_router(data.router)
-    app.include_router(health.router)
-    app.include_router(stats.router)
+    use_async = settings.db_async if async_db is None else async_db
+    for module in (data, export, series, health, stats, metrics):
+        app.include_router(module.async_router if use_async else module.router)
 
     @app.on_event("startup")
     def startup():
-        """Create tables on app startup"""
+        """Refuse to serve on an outdated schema; migrations run before deploy"""
+        from app.db.migrations import SchemaVersionError, ensure_schema
+        from app.db.session import engine
+
         try:
-            Base.metadata.create_all(bind=engine)
+            ensure_schema(engine)
+        except SchemaVersionError:
+            raise
         except Exception as e:
-            print(f"Warning: Could not create database tables: {e}")
+            print(f"Warning: Could not check the database schema: {e}")
 
     return app
 
 
-app = create_app()
+@lru_cache(maxsize=None)
+def get_app() -> FastAPI:
+    return create_app()
+
+
+def __getattr__(name: str) -> Any:
+    # ``app.main:app`` is built on first access, so importing this module
+    # (tests, tooling) does not read settings.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,3 +8,4 @@ class EtlStats(BaseModel):
     total_processed: int
     last_success: datetime | None = None
     last_failure: datetime | None = None
+    last_duration_seconds: float | None = None
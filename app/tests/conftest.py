@@ -1,16 +1,36 @@
+import os
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from fastapi.testclient import TestClient
 
-from app.db.session import Base, get_db
-from app.main import create_app
+os.environ.setdefault("API_KEY", "test-key")
+
+from app.api import cache  # noqa: E402
+from app.db.session import Base, get_db  # noqa: E402
+from app.main import create_app  # noqa: E402
+
 
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    cache.reset()
+    yield
+    cache.reset()
 
-@pytest.fixture(scope="session")
+
+@pytest.fixture
 def db_engine():
-    engine = create_engine("sqlite:///:memory:", future=True)
+    # TestClient runs handlers in a worker thread, so the in-memory database
+    # must live on a single shared connection.
+    engine = create_engine(
+        "sqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Base.metadata.create_all(bind=engine)
     return engine
 
@@ -0,0 +1,29 @@
+from app.db import models
+from app.ingestion import api_source, etl_runner
+from app.ingestion.hashing import stable_external_id
+from benchmarks.stub_coingecko import StubCoinGecko, make_coin
+
+
+def test_unchanged_api_records_are_skipped(db_session, monkeypatch):
+    coins = [make_coin(i) for i in range(5)]
+    with StubCoinGecko(coins) as stub:
+        fetcher = api_source.CoinGeckoFetcher(url=stub.url, per_page=2)
+        monkeypatch.setattr(api_source, "_fetcher", fetcher)
+        try:
+            etl_runner.run_for_source(db_session, "api")
+            etl_runner.run_for_source(db_session, "api")
+            coins[3] = make_coin(3, price=999.0)
+            etl_runner.run_for_source(db_session, "api")
+        finally:
+            fetcher.close()
+
+    runs = db_session.query(models.EtlRun).order_by(models.EtlRun.id).all()
+    assert [(r.records_changed, r.records_skipped) for r in runs] == [(5, 0), (0, 5), (1, 4)]
+    assert db_session.query(models.RawAPIRecord).count() == 6
+    coin = db_session.query(models.UnifiedRecord).filter_by(external_id="coin-3").one()
+    assert coin.value == 999 and len(coin.content_hash) == 64
+
+
+def test_stable_external_id_is_deterministic():
+    assert stable_external_id("bitcoin") == stable_external_id("bitcoin")
+    assert 0 <= stable_external_id("bitcoin") < 10 ** 8
@@ -0,0 +1,54 @@
+import time
+
+import httpx
+
+from app.ingestion.api_source import CoinGeckoFetcher, transform_api_to_unified
+from benchmarks.stub_coingecko import StubCoinGecko, make_coin
+
+
+def test_fetcher_walks_all_pages_and_retries_429():
+    coins = [make_coin(i) for i in range(7)]
+    with StubCoinGecko(coins, throttle={2: 2}) as stub:
+        fetcher = CoinGeckoFetcher(url=stub.url, per_page=3, max_in_flight=2, backoff_base=0)
+        try:
+            pages = list(fetcher.iter_pages())
+            # second run reuses the pooled client on the same loop
+            again = [rec for page in fetcher.iter_pages() for rec in page]
+        finally:
+            fetcher.close()
+
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [rec["id"] for page in pages for rec in page] == [c["id"] for c in coins]
+    assert again == coins
+    assert stub.hits[2] >= 3
+    assert len(transform_api_to_unified(again)) == 7
+
+
+def test_fetcher_stops_on_exact_multiple_of_page_size():
+    coins = [make_coin(i) for i in range(4)]
+    with StubCoinGecko(coins) as stub:
+        fetcher = CoinGeckoFetcher(url=stub.url, per_page=2, max_in_flight=3)
+        try:
+            assert sum(len(p) for p in fetcher.iter_pages()) == 4
+        finally:
+            fetcher.close()
+
+
+def test_closing_early_does_not_wait_for_retries():
+    def handler(request):
+        if request.url.params["page"] == "1":
+            return httpx.Response(200, json=[make_coin(0), make_coin(1)])
+        return httpx.Response(503)
+
+    fetcher = CoinGeckoFetcher(
+        url="http://coingecko.test/markets", per_page=2, max_in_flight=2, max_retries=5,
+        backoff_base=30, transport=httpx.MockTransport(handler),
+    )
+    try:
+        pages = fetcher.iter_pages()
+        assert len(next(pages)) == 2
+        started = time.monotonic()
+        pages.close()  # page 2 is now backing off for 30s
+        assert time.monotonic() - started < 5
+    finally:
+        fetcher.close()
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.async_session import create_engine_for
+from app.db.session import Base, get_async_db
+from app.main import create_app
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url, future=True)
+    Base.metadata.create_all(bind=sync_engine)
+    with sessionmaker(bind=sync_engine, future=True)() as db:
+        db.add(
+            models.UnifiedRecord(
+                source="csv1", external_id="1", name="Bitcoin (BTC)", value=43250,
+                timestamp=datetime(2024, 12, 10, 8, 0),
+            )
+        )
+        db.add(models.EtlSourceStats(source="csv1", total_runs=1, total_processed=1))
+        db.commit()
+
+    async_engine = create_engine_for(url)
+
+    async def override_get_async_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+
+    app = create_app(async_db=True)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield TestClient(app)
+
+
+def test_async_routes_match_sync_shape(async_client):
+    data = async_client.get("/data", params={"source": "CSV1"}).json()
+    assert data["pagination"]["total"] == 1
+    assert data["data"][0]["name"] == "Bitcoin (BTC)"
+
+    assert async_client.get("/stats").json()["stats"][0]["source"] == "csv1"
+
+    health = async_client.get("/health")
+    assert health.json()["database"] == "UP"
+    assert async_client.get("/health", headers={"If-None-Match": health.headers["etag"]}).status_code == 304
+
+    export = async_client.get("/data/export", params={"format": "csv"}, headers={"Accept-Encoding": "gzip"})
+    assert export.headers["content-encoding"] == "gzip"
+    assert export.text.splitlines()[1].startswith("1,csv1,1,Bitcoin (BTC),43250,")
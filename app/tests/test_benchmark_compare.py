@@ -0,0 +1,21 @@
+from benchmarks.generators import SyntheticCoins, parse_scale, write_source1_csv
+from benchmarks.run import compare
+from app.ingestion import csv_source1
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"etl.csv1.wall_seconds": 10.0, "api.stats.throughput_rps": 100.0, "api.stats.errors": 0}
+    ok = {"etl.csv1.wall_seconds": 11.0, "api.stats.throughput_rps": 95.0, "api.stats.errors": 0}
+    bad = {"etl.csv1.wall_seconds": 13.0, "api.stats.throughput_rps": 70.0, "api.stats.errors": 2}
+    assert compare(ok, baseline, 0.2) == []
+    assert len(compare(bad, baseline, 0.2)) == 3
+
+
+def test_generators_match_source_shapes(tmp_path, monkeypatch):
+    assert parse_scale("1M") == 1_000_000
+    coins = SyntheticCoins(5)
+    assert len(coins[3:10]) == 2 and coins[-1]["id"] == "coin-4"
+
+    monkeypatch.setattr(csv_source1, "DATA_PATH", write_source1_csv(tmp_path / "s1.csv", 25))
+    rows = csv_source1.read_csv1()
+    assert len(csv_source1.transform_csv1_to_unified(rows)) == 25
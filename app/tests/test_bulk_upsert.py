@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+
+from app.db import models
+from app.ingestion.bulk import MAX_BATCH_ROWS, bulk_upsert_unified
+
+
+def _rows(n, value=1):
+    return [
+        {
+            "source": "csv1",
+            "external_id": str(i),
+            "name": f"row {i}",
+            "value": value,
+            "timestamp": datetime(2024, 12, 10, 8, 0),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_bulk_upsert_counts_inserts_and_updates(db_session, native):
+    first = bulk_upsert_unified(db_session, _rows(5), batch_size=2, native=native)
+    db_session.commit()
+    assert (first.inserted, first.updated, first.batches) == (5, 0, 3)
+
+    second = bulk_upsert_unified(db_session, _rows(7, value=9), batch_size=3, native=native)
+    db_session.commit()
+    assert (second.inserted, second.updated, second.batches) == (2, 5, 3)
+
+    rows = db_session.query(models.UnifiedRecord).order_by(models.UnifiedRecord.id).all()
+    assert len(rows) == 7
+    assert {r.value for r in rows} == {9}
+
+
+def test_batches_stay_under_the_bind_parameter_limit(db_session):
+    result = bulk_upsert_unified(db_session, _rows(MAX_BATCH_ROWS + 1), batch_size=100_000)
+    assert (result.inserted, result.batches) == (MAX_BATCH_ROWS + 1, 2)
@@ -0,0 +1,95 @@
+import threading
+
+from app.db import models
+from app.ingestion import csv_source1, etl_runner
+from app.ingestion.csv_tail import CsvTail
+
+HEADER = "id,name,value,timestamp\n"
+
+
+def _line(i):
+    return f"{i},Coin {i},{i}.5,2024-12-10T08:00:00\n"
+
+
+def _stage_bytes(db_session):
+    run = db_session.query(models.EtlRun).order_by(models.EtlRun.id.desc()).first()
+    stage = db_session.query(models.EtlRunStage).filter_by(run_id=run.id, stage="extract").one()
+    return stage.bytes_read
+
+
+def test_appended_rows_are_read_from_the_saved_offset(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "source1.csv"
+    path.write_text(HEADER + "".join(_line(i) for i in range(1, 201)), encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+
+    etl_runner.run_for_source(db_session, "csv1", chunk_size=50)
+    position = etl_runner.get_file_position(db_session, "csv1")
+    assert position.offset == path.stat().st_size
+
+    appended = _line(201) + _line(202)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(appended + "203,Coin 203,1")  # last line still being written
+    etl_runner.run_for_source(db_session, "csv1", chunk_size=50, tail=True)
+
+    assert db_session.query(models.UnifiedRecord).count() == 202
+    assert etl_runner.get_checkpoint(db_session, "csv1") == 202
+    # Only the header block and the appended bytes are read, not the ~7.7KB file.
+    assert _stage_bytes(db_session) < 1024 < position.offset
+    assert etl_runner.get_file_position(db_session, "csv1").offset == position.offset + len(appended)
+
+
+def test_replaced_or_truncated_file_is_rescanned(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_text(HEADER + _line(1) + _line(2), encoding="utf-8")
+    first = CsvTail(path, "id")
+    assert [r["id"] for r in first] == ["1", "2"]
+
+    path.write_text(HEADER + _line(3), encoding="utf-8")  # shorter than the saved offset
+    tail = CsvTail(path, "id", last_external_id=2, saved=first.position)
+    assert [r["id"] for r in tail] == ["3"] and not tail.resumed
+
+    path.write_text("id,name,value,timestamp,extra\n" + _line(4) + _line(5) + _line(6), encoding="utf-8")
+    tail = CsvTail(path, "id", last_external_id=3, saved=first.position)
+    assert [r["id"] for r in tail] == ["4", "5", "6"] and not tail.resumed
+
+
+def test_in_place_rewrite_is_rescanned(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_text(HEADER + _line(1) + _line(2), encoding="utf-8")
+    first = CsvTail(path, "id")
+    assert [r["id"] for r in first] == ["1", "2"]
+    inode = path.stat().st_ino
+
+    # Same inode and header, longer than the saved offset, which now falls
+    # in the middle of a row.
+    with open(path, "r+", encoding="utf-8") as f:
+        f.write(HEADER + _line(10) + _line(11) + _line(12))
+    assert path.stat().st_ino == inode and path.stat().st_size > first.position.offset
+    tail = CsvTail(path, "id", last_external_id=2, saved=first.position)
+    assert [r["id"] for r in tail] == ["10", "11", "12"] and not tail.resumed
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(_line(13))
+    appended = CsvTail(path, "id", last_external_id=12, saved=tail.position)
+    assert [r["id"] for r in appended] == ["13"] and appended.resumed
+
+
+def test_watch_runs_when_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "source1.csv"
+    path.write_text(HEADER + _line(1), encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+    monkeypatch.setattr(etl_runner, "ensure_schema", lambda engine: None)
+    stop, runs = threading.Event(), []
+
+    def fake_run(source, tail=False):
+        assert tail
+        runs.append(source)
+        if len(runs) == 1:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(_line(2))
+        else:
+            stop.set()
+
+    monkeypatch.setattr(etl_runner, "run_source_isolated", fake_run)
+    etl_runner.watch(("csv1",), poll_seconds=0.01, stop=stop)
+    assert runs == ["csv1", "csv1"]
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from app.db import models
+
+
+def _seed(db_session):
+    for i in range(5):
+        db_session.add(
+            models.UnifiedRecord(
+                source="csv1" if i % 2 == 0 else "csv2",
+                external_id=str(i),
+                name=f"Coin {i}",
+                value=i,
+                timestamp=datetime(2024, 12, 10, 8, i),
+            )
+        )
+    db_session.commit()
+
+
+def test_cursor_pagination_walks_all_rows(client, db_session):
+    _seed(db_session)
+    seen, cursor = [], None
+    while True:
+        params = {"pagination": "cursor", "page_size": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/data", params=params).json()
+        seen += [row["external_id"] for row in body["data"]]
+        cursor = body["pagination"]["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["0", "1", "2", "3", "4"]
+    assert body["pagination"]["total"] is None
+
+
+def test_cursor_is_bound_to_source_filter(client, db_session):
+    _seed(db_session)
+    first = client.get("/data", params={"pagination": "cursor", "page_size": 2, "source": "csv1", "total": "approx"})
+    body = first.json()
+    assert [row["external_id"] for row in body["data"]] == ["0", "2"]
+    assert body["pagination"]["total"] == 3
+
+    cursor = body["pagination"]["next_cursor"]
+    rest = client.get("/data", params={"cursor": cursor, "source": "csv1"}).json()
+    assert [row["external_id"] for row in rest["data"]] == ["4"]
+    assert client.get("/data", params={"cursor": cursor}).status_code == 400
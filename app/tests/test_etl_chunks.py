@@ -0,0 +1,51 @@
+import pytest
+
+from app.db import models
+from app.ingestion import csv_source1, etl_runner
+from app.ingestion.sources import get_source
+
+
+@pytest.fixture
+def csv1_file(tmp_path, monkeypatch):
+    path = tmp_path / "source1.csv"
+    lines = ["id,name,value,timestamp"]
+    lines += [f"{i},Coin {i},{i}.5,2024-12-10T08:00:00" for i in range(1, 8)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+    return path
+
+
+def test_chunked_run_commits_and_checkpoints_each_chunk(db_session, csv1_file):
+    etl_runner.run_for_source(db_session, "csv1", chunk_size=3)
+
+    run = db_session.query(models.EtlRun).one()
+    assert run.status == "SUCCESS"
+    assert run.records_processed == 7
+    assert etl_runner.get_checkpoint(db_session, "csv1") == 7
+    assert db_session.query(models.UnifiedRecord).count() == 7
+
+
+def test_failed_chunk_resumes_from_last_commit(db_session, csv1_file, monkeypatch):
+    calls = {"n": 0}
+    plugin = get_source("csv1")
+    real_transform = plugin.transform
+
+    def flaky_transform(rows):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("boom")
+        return real_transform(rows)
+
+    monkeypatch.setattr(plugin, "transform", flaky_transform)
+    with pytest.raises(RuntimeError):
+        etl_runner.run_for_source(db_session, "csv1", chunk_size=3)
+
+    assert etl_runner.get_checkpoint(db_session, "csv1") == 3
+    assert db_session.query(models.RawCSVRecord).count() == 3
+
+    monkeypatch.setattr(plugin, "transform", real_transform)
+    etl_runner.run_for_source(db_session, "csv1", chunk_size=3)
+
+    assert etl_runner.get_checkpoint(db_session, "csv1") == 7
+    assert db_session.query(models.RawCSVRecord).count() == 7
+    assert db_session.query(models.UnifiedRecord).count() == 7
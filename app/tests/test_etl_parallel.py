@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models, session
+from app.db.migrations import upgrade
+from app.ingestion import api_source, etl_runner
+
+
+def test_parallel_main_isolates_source_failures(tmp_path, monkeypatch, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'etl.db'}", future=True, connect_args={"timeout": 30})
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+    upgrade(engine)
+    monkeypatch.setattr(session, "engine", engine)
+    monkeypatch.setattr(session, "SessionLocal", Session)
+
+    def broken_fetch(last_external_id=None):
+        raise RuntimeError("api down")
+
+    monkeypatch.setattr(api_source, "iter_api_records", broken_fetch)
+
+    failures = etl_runner.main(parallel=True, workers=3)
+
+    assert failures == {"api": "api down"}
+    # SQLite has a single writer, so the sources ran one after another.
+    assert "running sources serially" in caplog.text
+    with Session() as db:
+        statuses = {run.source: run.status for run in db.query(models.EtlRun)}
+        assert statuses == {"api": "FAILURE", "csv1": "SUCCESS", "csv2": "SUCCESS"}
+        assert etl_runner.get_checkpoint(db, "csv1") == 10
+        assert etl_runner.get_checkpoint(db, "api") is None
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+from app.api.metrics import REQUEST_LATENCY
+from app.db import models
+
+
+def _seed(db_session):
+    for i in range(5):
+        db_session.add(
+            models.UnifiedRecord(source="csv1", external_id=str(i), name=f"Asset, {i}", value=i,
+                                 timestamp=datetime(2024, 12, 10, i))
+        )
+    db_session.add(models.UnifiedRecord(source="csv2", external_id="9", name="Other", value=9,
+                                        timestamp=datetime(2024, 12, 10, 2)))
+    db_session.commit()
+
+
+def test_ndjson_export_filters_by_source_and_time(client, db_session, monkeypatch):
+    from app.api.routes import export
+
+    monkeypatch.setattr(export.settings, "export_batch_size", 2)
+    _seed(db_session)
+    resp = client.get(
+        "/data/export",
+        params={"source": "csv1", "start": "2024-12-10T01:00:00", "end": "2024-12-10T04:00:00"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in resp.headers
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [(r["external_id"], r["timestamp"]) for r in rows] == [
+        ("1", "2024-12-10T01:00:00"),
+        ("2", "2024-12-10T02:00:00"),
+        ("3", "2024-12-10T03:00:00"),
+    ]
+
+
+def test_csv_export_is_gzipped_when_accepted(client, db_session):
+    _seed(db_session)
+    resp = client.get("/data/export", params={"format": "csv"}, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    # httpx decodes the gzip body transparently.
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == 6
+    assert rows[0] == {"id": "1", "source": "csv1", "external_id": "0", "name": "Asset, 0", "value": "0",
+                       "timestamp": "2024-12-10T00:00:00"}
+
+
+def test_export_latency_covers_the_whole_stream(client, db_session, monkeypatch):
+    from app.api.routes import export
+
+    _seed(db_session)
+    encode = export.encode_rows
+
+    def slow_encode(rows, fmt):
+        time.sleep(0.2)
+        return encode(rows, fmt)
+
+    monkeypatch.setattr(export, "encode_rows", slow_encode)
+    before = REQUEST_LATENCY._series.get(("/data/export",), [None, 0, 0.0])[2]
+    client.get("/data/export")
+    assert REQUEST_LATENCY._series[("/data/export",)][2] - before >= 0.2
@@ -1,3 +1,5 @@
+from sqlalchemy.exc import OperationalError
+
 from app.db import models
 
 
@@ -8,3 +10,14 @@ def test_health(client, db_session):
     body = response.json()
     assert "database" in body
     assert "etl_last_run" in body
+
+
+def test_health_probes_the_database_past_the_cache(client, db_session, monkeypatch):
+    assert client.get("/health").json()["database"] == "UP"
+
+    def down(*args, **kwargs):
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(db_session, "execute", down)
+    body = client.get("/health").json()
+    assert (body["status"], body["database"]) == ("DEGRADED", "DOWN")
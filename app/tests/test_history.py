@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.db import models
+from app.ingestion import csv_source1, history
+from app.ingestion.bulk import bulk_upsert_unified
+from app.ingestion.etl_runner import run_for_source
+
+
+def _point(value, minute, second=0):
+    return {
+        "source": "coingecko_api",
+        "external_id": "bitcoin",
+        "name": "Bitcoin",
+        "value": value,
+        "timestamp": datetime(2024, 12, 10, 8, minute, second, tzinfo=timezone.utc),
+    }
+
+
+def test_upserts_append_history_and_merge_rollups(db_session):
+    bulk_upsert_unified(db_session, [_point(100, 0, 10), _point(120, 0, 40)])
+    # A replayed point is ignored; later points extend the open buckets.
+    bulk_upsert_unified(db_session, [_point(120, 0, 40), _point(90, 0, 20), _point(110, 1)])
+    db_session.commit()
+
+    history = db_session.execute(select(models.UnifiedHistory).order_by(models.UnifiedHistory.timestamp)).scalars().all()
+    assert [p.value for p in history] == [100, 90, 120, 110]
+    latest = db_session.execute(select(models.UnifiedRecord)).scalars().one()
+    assert latest.value == 110
+
+    rollups = {
+        (r.interval, r.bucket_start.minute): (r.open, r.high, r.low, r.close, r.count)
+        for r in db_session.execute(select(models.UnifiedRollup)).scalars()
+    }
+    assert rollups == {
+        ("1m", 0): (100, 120, 90, 120, 3),
+        ("1m", 1): (110, 110, 110, 110, 1),
+        ("1h", 0): (100, 120, 90, 110, 4),
+        ("1d", 0): (100, 120, 90, 110, 4),
+    }
+
+
+def test_points_stored_by_a_concurrent_writer_are_not_merged_twice(db_session, monkeypatch):
+    assert history.append_history(db_session, [_point(100, 0, 10)]) == 1
+    # Another writer stored the point after this one checked for it.
+    monkeypatch.setattr(history, "_existing_points", lambda db, keys: set())
+    assert history.append_history(db_session, [_point(100, 0, 10), _point(120, 0, 40)]) == 1
+    db_session.commit()
+
+    counts = {r.interval: r.count for r in db_session.execute(select(models.UnifiedRollup)).scalars()}
+    assert counts == {"1m": 2, "1h": 2, "1d": 2}
+
+
+def test_history_and_rollup_endpoints_page_by_time(client, db_session):
+    bulk_upsert_unified(db_session, [_point(100 + minute, minute) for minute in range(5)])
+    db_session.commit()
+
+    params = {
+        "source": "coingecko_api",
+        "external_id": "bitcoin",
+        "start": "2024-12-10T08:01:00",
+        "end": "2024-12-10T08:05:00",
+        "limit": 2,
+    }
+    first = client.get("/data/history", params=params).json()
+    assert [p["value"] for p in first["data"]] == [101, 102]
+    rest = client.get("/data/history", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [p["value"] for p in rest["data"]] == [103, 104]
+    assert rest["next_cursor"] is None
+
+    hourly = client.get(
+        "/data/rollups", params={**params, "start": "2024-12-10T00:00:00", "interval": "1h"}
+    ).json()
+    assert hourly["data"] == [
+        {"bucket_start": "2024-12-10T08:00:00", "open": 100, "high": 104, "low": 100, "close": 104, "count": 5}
+    ]
+
+
+def test_csv_sources_write_no_history(db_session, tmp_path, monkeypatch):
+    csv_path = tmp_path / "source1.csv"
+    csv_path.write_text("id,name,value,timestamp\n1,Asset 1,10,2024-12-10T08:00:00\n", encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", csv_path)
+
+    run_for_source(db_session, "csv1")
+
+    assert db_session.execute(select(models.UnifiedRecord)).scalars().one().value == 10
+    assert db_session.execute(select(models.UnifiedHistory)).first() is None
+    assert db_session.execute(select(models.UnifiedRollup)).first() is None
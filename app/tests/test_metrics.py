@@ -0,0 +1,18 @@
+from app.db import models
+from app.ingestion import etl_runner
+
+
+def test_stage_metrics_persisted_and_exposed(client, db_session):
+    etl_runner.run_for_source(db_session, "csv1")
+
+    stages = {s.stage: s for s in db_session.query(models.EtlRunStage)}
+    assert {"extract", "store_raw", "transform", "upsert", "commit"} <= set(stages)
+    assert stages["extract"].rows == 10
+    assert stages["extract"].bytes_read > 0
+    assert stages["upsert"].statements >= 2
+
+    client.get("/data")
+    body = client.get("/metrics").text
+    assert 'api_request_duration_seconds_count{route="/data"}' in body
+    assert 'etl_stage_bytes_read{source="csv1",stage="extract"}' in body
+    assert 'etl_source_runs_total{source="csv1"} 1' in body
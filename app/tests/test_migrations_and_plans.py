@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.config import settings
+from app.db.migrations import HEAD, SchemaVersionError, check_schema, current_version, ensure_schema, upgrade
+from app.db.query_plans import check_query_plans
+
+# unified_records / etl_runs as created by the original create_all schema.
+LEGACY_DDL = (
+    """CREATE TABLE unified_records (
+        id INTEGER NOT NULL PRIMARY KEY, source VARCHAR, external_id VARCHAR, name VARCHAR,
+        value INTEGER, timestamp DATETIME,
+        CONSTRAINT uix_source_external UNIQUE (source, external_id))""",
+    "CREATE INDEX ix_unified_records_id ON unified_records (id)",
+    "CREATE INDEX ix_unified_records_source ON unified_records (source)",
+    "CREATE INDEX ix_unified_records_external_id ON unified_records (external_id)",
+    """CREATE TABLE etl_runs (
+        id INTEGER NOT NULL PRIMARY KEY, source VARCHAR, status VARCHAR, records_processed INTEGER,
+        error_message VARCHAR, started_at DATETIME, finished_at DATETIME)""",
+)
+
+
+def test_upgrade_brings_legacy_schema_to_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}", future=True)
+    with engine.begin() as conn:
+        for ddl in LEGACY_DDL:
+            conn.execute(text(ddl))
+
+    applied = upgrade(engine)
+    assert [m.version for m in applied] == list(range(1, HEAD + 1))
+    assert upgrade(engine) == []
+
+    inspector = inspect(engine)
+    indexes = {ix["name"] for ix in inspector.get_indexes("unified_records")}
+    assert {"ix_unified_records_source_id", "ix_unified_records_source_timestamp"} <= indexes
+    assert not indexes & {"ix_unified_records_id", "ix_unified_records_source", "ix_unified_records_external_id"}
+    assert "content_hash" in {c["name"] for c in inspector.get_columns("unified_records")}
+    assert "records_skipped" in {c["name"] for c in inspector.get_columns("etl_runs")}
+    with engine.connect() as conn:
+        assert current_version(conn) == HEAD
+
+    assert check_query_plans(engine) == {}
+
+
+@pytest.mark.parametrize(
+    "index, query",
+    [
+        ("ix_unified_records_source_timestamp", "time_window_by_source"),
+        ("ix_unified_records_timestamp_id", "export_time_window"),
+    ],
+)
+def test_plan_check_flags_missing_index(tmp_path, index, query):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}", future=True)
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {index}"))
+    failures = check_query_plans(engine)
+    assert set(failures) == {query}
+
+
+def test_startup_only_checks_the_version_unless_auto_migrate(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}", future=True)
+    with pytest.raises(SchemaVersionError):
+        ensure_schema(engine)
+    assert inspect(engine).get_table_names() == []
+
+    upgrade(engine, target=HEAD - 1)
+    with pytest.raises(SchemaVersionError, match=f"version {HEAD - 1}"):
+        check_schema(engine)
+
+    monkeypatch.setattr(settings, "db_auto_migrate", True)
+    assert ensure_schema(engine) == HEAD
+
+
+def test_history_backfill_runs_in_committed_batches(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}", future=True)
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_DDL[0]))
+        for i in range(1, 8):
+            conn.execute(
+                text("INSERT INTO unified_records (source, external_id, value, timestamp) VALUES ('csv1', :e, :v, :t)"),
+                {"e": str(i), "v": i, "t": f"2024-12-10 08:0{i}:00"},
+            )
+    upgrade(engine, target=2)
+
+    from app.ingestion import history
+
+    calls = []
+    real_batch = history.backfill_history_batch
+
+    def batch(conn, after_id):
+        calls.append(after_id)
+        return real_batch(conn, after_id, batch_size=3)
+
+    monkeypatch.setattr(history, "backfill_history_batch", batch)
+    upgrade(engine, target=3)
+
+    assert calls == [0, 3, 6, 7]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM unified_history")).scalar() == 7
+        assert current_version(conn) == 3
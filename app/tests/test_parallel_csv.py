@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from app.core.config import settings
+from app.db import models
+from app.ingestion import csv_source1, etl_runner
+from app.ingestion.parallel_csv import split_ranges
+
+HEADER = "id,name,value,timestamp\n"
+
+
+def _line(i):
+    return f'{i},"Coin {i}, Inc",{i}.5,2024-12-10T08:{i % 60:02d}:00\n'
+
+
+def _snapshot(db):
+    raw = [
+        (r.external_id, r.payload)
+        for r in db.query(models.RawCSVRecord).order_by(models.RawCSVRecord.id)
+    ]
+    unified = [
+        (r.source, r.external_id, r.name, r.value, r.timestamp)
+        for r in db.query(models.UnifiedRecord).order_by(models.UnifiedRecord.external_id)
+    ]
+    cp = db.query(models.Checkpoint).filter_by(source="csv1").one()
+    return raw, unified, (cp.last_external_id, cp.file_offset, cp.file_size)
+
+
+def _reset(db):
+    for model in (models.RawCSVRecord, models.UnifiedRecord, models.Checkpoint):
+        db.query(model).delete()
+    db.commit()
+
+
+def test_split_ranges_end_on_line_boundaries():
+    data = b"".join(_line(i).encode() for i in range(1, 101)) + b"7,partial"
+    ranges = split_ranges(io.BytesIO(data), 0, len(data), 256)
+
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges)
+    assert ranges[-1][1] == len(data) - len(b"7,partial")
+
+
+def test_parallel_parse_matches_serial(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "source1.csv"
+    path.write_text(HEADER + "".join(_line(i) for i in range(1, 301)) + "301,Coin", encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+
+    # In tail mode the unterminated last line is still being written.
+    etl_runner.run_for_source(db_session, "csv1", chunk_size=40, tail=True)
+    serial = _snapshot(db_session)
+    _reset(db_session)
+
+    monkeypatch.setattr(settings, "etl_parse_mode", "parallel")
+    monkeypatch.setattr(settings, "etl_parse_workers", 2)
+    monkeypatch.setattr(settings, "etl_parse_range_bytes", 2048)
+    etl_runner.run_for_source(db_session, "csv1", tail=True)
+
+    assert _snapshot(db_session) == serial
+    assert len(serial[0]) == 300
+    assert serial[0][0][1]["name"] == "Coin 1, Inc"
+
+
+def test_parallel_parse_resumes_from_checkpoint(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "source1.csv"
+    path.write_text(HEADER + "".join(_line(i) for i in range(1, 101)), encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+    monkeypatch.setattr(settings, "etl_parse_mode", "parallel")
+    monkeypatch.setattr(settings, "etl_parse_workers", 1)
+    monkeypatch.setattr(settings, "etl_parse_range_bytes", 1024)
+
+    etl_runner.run_for_source(db_session, "csv1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(_line(101) + _line(102))
+    etl_runner.run_for_source(db_session, "csv1")
+
+    assert db_session.query(models.RawCSVRecord).count() == 102
+    assert etl_runner.get_checkpoint(db_session, "csv1") == 102
+    assert etl_runner.get_file_position(db_session, "csv1").offset == path.stat().st_size
+    run = db_session.query(models.EtlRun).order_by(models.EtlRun.id.desc()).first()
+    assert run.records_processed == 2
+
+
+@pytest.mark.parametrize("mode", ["serial", "parallel"])
+def test_last_line_without_newline_is_ingested_once(db_session, tmp_path, monkeypatch, mode):
+    path = tmp_path / "source1.csv"
+    path.write_text(HEADER + _line(1) + _line(2).rstrip("\n"), encoding="utf-8")
+    monkeypatch.setattr(csv_source1, "DATA_PATH", path)
+    monkeypatch.setattr(settings, "etl_parse_mode", mode)
+    monkeypatch.setattr(settings, "etl_parse_workers", 1)
+
+    etl_runner.run_for_source(db_session, "csv1")
+    etl_runner.run_for_source(db_session, "csv1")
+
+    assert db_session.query(models.UnifiedRecord).count() == 2
+    runs = db_session.query(models.EtlRun).order_by(models.EtlRun.id).all()
+    assert [run.records_processed for run in runs] == [2, 0]
+    assert etl_runner.get_file_position(db_session, "csv1").offset == path.stat().st_size
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db import models
+from app.ingestion.api_source import select_raw_api_payloads
+from benchmarks.stub_coingecko import make_coin
+
+
+def test_postgres_stores_payloads_as_indexed_jsonb():
+    dialect = postgresql.dialect()
+    assert "payload JSONB NOT NULL" in str(CreateTable(models.RawAPIRecord.__table__).compile(dialect=dialect))
+    ddl = [str(CreateIndex(index).compile(dialect=dialect)) for index in models.RAW_API_PAYLOAD_INDEXES]
+    assert "USING gin (payload jsonb_path_ops)" in ddl[0]
+    assert "((payload ->> 'id'), received_at)" in ddl[1]
+    assert "((payload ->> 'symbol'))" in ddl[2]
+    assert "((payload ->> 'last_updated'))" in ddl[3]
+
+
+def test_sqlite_keeps_json_and_filters_payload_keys(db_session):
+    names = {index["name"] for index in inspect(db_session.get_bind()).get_indexes("raw_api_records")}
+    assert not names & {index.name for index in models.RAW_API_PAYLOAD_INDEXES}
+
+    for day, coin in ((1, 1), (2, 2), (3, 1), (9, 1)):
+        db_session.add(
+            models.RawAPIRecord(external_id=coin, payload=make_coin(coin), received_at=datetime(2024, 12, day))
+        )
+    db_session.commit()
+
+    stmt = select_raw_api_payloads("coin-1", since=datetime(2024, 12, 1), until=datetime(2024, 12, 8))
+    rows = db_session.execute(stmt).all()
+    assert [row.received_at.day for row in rows] == [1, 3]
+    assert all(row.payload["symbol"] == "c1" for row in rows)
@@ -0,0 +1,48 @@
+from app.db.generation import bump_generation, local_version, read_generation
+from app.ingestion.etl_runner import commit_run
+from app.ingestion.source_stats import record_progress
+
+
+def test_stats_etag_and_invalidation(client, db_session):
+    record_progress(db_session, "csv1", 3)
+    commit_run(db_session, "csv1")
+
+    first = client.get("/stats")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["stats"][0]["total_processed"] == 3
+
+    cached = client.get("/stats", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    # A write without a generation bump is not visible through the cache ...
+    record_progress(db_session, "csv1", 4)
+    db_session.commit()
+    assert client.get("/stats").json()["stats"][0]["total_processed"] == 3
+
+    # ... but the ETL commit path invalidates it.
+    commit_run(db_session, "csv1")
+    fresh = client.get("/stats", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["stats"][0]["total_processed"] == 7
+
+
+def test_data_cache_keeps_per_request_meta(client):
+    first = client.get("/data").json()
+    second = client.get("/data").json()
+    assert first["data"] == second["data"]
+    assert first["meta"]["request_id"] != second["meta"]["request_id"]
+
+
+def test_local_generation_moves_only_on_commit(db_session):
+    before = local_version()
+    bump_generation(db_session, "csv1")
+    assert local_version() == before
+    db_session.rollback()
+    assert local_version() == before and read_generation(db_session) == ()
+
+    bump_generation(db_session, "csv1")
+    db_session.commit()
+    assert local_version() == before + 1
+    assert read_generation(db_session) == (("csv1", 1),)
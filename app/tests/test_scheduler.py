@@ -0,0 +1,83 @@
+import random
+import threading
+import time
+
+from app.ingestion.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_until_idle(scheduler, *sources):
+    deadline = time.monotonic() + 5
+    while scheduler.running() & set(sources):
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_sources_run_on_their_own_interval_without_overlap():
+    clock = FakeClock()
+    # One gate per run, keyed by (source, start time), so releasing a run
+    # never lets a later run of the same source finish early.
+    release = {key: threading.Event() for key in (("api", 0), ("api", 12), ("api", 30), ("csv1", 0), ("csv1", 30))}
+    calls = []
+
+    def run(source):
+        started_at = clock.now
+        calls.append((source, started_at))
+        release[(source, started_at)].wait(5)
+
+    scheduler = Scheduler(("api", "csv1"), intervals={"api": 10, "csv1": 30}, jitter=0, run=run, clock=clock)
+    assert scheduler.tick() == ["api", "csv1"]
+
+    # api is due again but still running, so it is not started twice.
+    clock.now = 12
+    assert scheduler.tick() == []
+    release[("api", 0)].set()
+    _wait_until_idle(scheduler, "api")
+    assert scheduler.tick() == ["api"]
+    assert scheduler.running() == {"api", "csv1"}
+
+    release[("api", 12)].set()
+    release[("csv1", 0)].set()
+    _wait_until_idle(scheduler, "api", "csv1")
+    assert scheduler.seconds_until_due() == 10  # api next due at 22
+    clock.now = 30
+    assert sorted(scheduler.tick()) == ["api", "csv1"]
+    release[("api", 30)].set()
+    release[("csv1", 30)].set()
+    _wait_until_idle(scheduler, "api", "csv1")
+    assert sorted(calls) == [("api", 0), ("api", 12), ("api", 30), ("csv1", 0), ("csv1", 30)]
+    scheduler.stop()
+    scheduler.run_forever()
+
+
+def test_jitter_stays_within_bounds():
+    scheduler = Scheduler(("api",), intervals={"api": 100}, jitter=0.2, run=lambda s: None, rng=random.Random(1))
+    delays = [scheduler.delay("api") for _ in range(200)]
+    assert 80 <= min(delays) < 90 and 110 < max(delays) <= 120
+    scheduler.stop()
+    scheduler.run_forever()
+
+
+def test_stop_waits_for_running_source():
+    started, release, done = threading.Event(), threading.Event(), threading.Event()
+
+    def run(source):
+        started.set()
+        release.wait(5)
+        done.set()
+
+    scheduler = Scheduler(("csv1",), intervals={"csv1": 60}, jitter=0, run=run)
+    loop = threading.Thread(target=scheduler.run_forever)
+    loop.start()
+    assert started.wait(5)
+    scheduler.stop()
+    release.set()
+    loop.join(5)
+    assert not loop.is_alive() and done.is_set()
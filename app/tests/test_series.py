@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from app.api.pagination import encode_token
+from app.db import models
+
+
+def _seed(db_session):
+    for i in range(6):
+        db_session.add(
+            models.UnifiedRecord(
+                source="coingecko_api",
+                external_id=f"coin-{i}",
+                name=f"Coin {i}",
+                value=100 + i,
+                timestamp=datetime(2024, 12, 10, 8, i // 2),
+            )
+        )
+    db_session.add(
+        models.UnifiedRecord(source="csv1", external_id="coin-1", name="Other", value=1,
+                             timestamp=datetime(2024, 12, 10, 8, 0))
+    )
+    db_session.commit()
+
+
+def test_latest_returns_only_requested_assets(client, db_session):
+    _seed(db_session)
+    body = client.get(
+        "/data/latest",
+        params={"source": "coingecko_api", "external_id": ["coin-1", "coin-4", "missing"]},
+    ).json()
+    assert [(r["external_id"], r["value"]) for r in body["data"]] == [("coin-1", 101), ("coin-4", 104)]
+    assert body["next_cursor"] is None
+
+
+def test_latest_rejects_too_many_assets(client, db_session):
+    ids = [f"coin-{i}" for i in range(1001)]
+    response = client.get("/data/latest", params={"source": "coingecko_api", "external_id": ids})
+    assert response.status_code == 422
+
+
+def test_latest_rejects_malformed_cursor(client, db_session):
+    _seed(db_session)
+    for token in ({"source": "coingecko_api"}, {"source": "coingecko_api", "id": "abc"},
+                  {"source": "coingecko_api", "id": None}):
+        response = client.get("/data/latest", params={"source": "coingecko_api", "cursor": encode_token(token)})
+        assert response.status_code == 400
+
+
+def test_range_pages_by_timestamp_with_cursor(client, db_session):
+    _seed(db_session)
+    params = {
+        "source": "coingecko_api",
+        "start": "2024-12-10T08:01:00",
+        "end": "2024-12-10T08:03:00",
+        "limit": 3,
+    }
+    first = client.get("/data/range", params=params).json()
+    assert [r["external_id"] for r in first["data"]] == ["coin-2", "coin-3", "coin-4"]
+    rest = client.get("/data/range", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [r["external_id"] for r in rest["data"]] == ["coin-5"]
+    assert rest["next_cursor"] is None
+
+    bad = client.get("/data/range", params={**params, "end": "2024-12-10T08:00:00"})
+    assert bad.status_code == 400
+
+    for other in ({"source": "csv1"}, {"start": "2024-12-10T08:00:00"}, {"external_id": "coin-5"}):
+        moved = client.get("/data/range", params={**params, **other, "cursor": first["next_cursor"]})
+        assert moved.status_code == 400
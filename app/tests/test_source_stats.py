@@ -0,0 +1,51 @@
+import pytest
+
+from app.db import models
+from app.ingestion import etl_runner
+from app.ingestion.source_stats import rebuild_source_stats, record_progress, record_run_started
+from app.ingestion.sources import get_source
+
+
+def _snapshot(db_session):
+    return {
+        row.source: (row.total_runs, row.total_processed, row.last_success, row.last_failure)
+        for row in db_session.query(models.EtlSourceStats)
+    }
+
+
+def test_incremental_stats_match_rebuild(client, db_session, monkeypatch):
+    etl_runner.run_for_source(db_session, "csv1")
+    etl_runner.run_for_source(db_session, "csv1")
+
+    def broken(rows):
+        raise RuntimeError("bad chunk")
+
+    monkeypatch.setattr(get_source("csv2"), "transform", broken)
+    with pytest.raises(RuntimeError):
+        etl_runner.run_for_source(db_session, "csv2")
+
+    incremental = _snapshot(db_session)
+    assert incremental["csv1"][:2] == (2, 10)
+    assert incremental["csv2"][0] == 1 and incremental["csv2"][3] is not None
+
+    rebuild_source_stats(db_session)
+    db_session.commit()
+    assert _snapshot(db_session) == incremental
+
+    body = client.get("/stats").json()
+    assert [row["source"] for row in body["stats"]] == ["csv1", "csv2"]
+    assert body["stats"][0]["last_duration_seconds"] is not None
+
+
+def test_counters_are_incremented_in_sql(db_session):
+    record_run_started(db_session, "csv1")
+    db_session.commit()
+    stale = db_session.get(models.EtlSourceStats, "csv1")
+    assert stale.total_runs == 1
+
+    # A row already loaded in the session does not overwrite newer counts.
+    record_run_started(db_session, "csv1")
+    record_progress(db_session, "csv1", 5)
+    stale.last_duration_seconds = 1.5
+    db_session.commit()
+    assert _snapshot(db_session)["csv1"][:2] == (2, 5)
@@ -0,0 +1,69 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import CsvFeed, Settings
+from app.db import models
+from app.ingestion import etl_runner, retention, sources
+
+
+@pytest.fixture
+def prices_feed(tmp_path, monkeypatch):
+    path = tmp_path / "prices.csv"
+    path.write_text(
+        "row,title,price,ts\n1,Gold,1900.5,2024-12-10T08:00:00\n2,Silver,24,2024-12-10T08:05:00\n",
+        encoding="utf-8",
+    )
+    feed = CsvFeed(name="prices", path=str(path), id_column="row", name_column="title",
+                   value_column="price", timestamp_column="ts", retention_days=1)
+    plugin = sources.CsvSource.from_config(feed)
+    monkeypatch.setitem(sources._registry, "prices", plugin)
+    return plugin
+
+
+def test_csv_feeds_are_parsed_from_json_env(monkeypatch):
+    monkeypatch.setenv("CSV_FEEDS", json.dumps([
+        {"name": "prices", "path": "data/prices.csv", "id_column": "row", "name_column": "title",
+         "value_column": "price", "timestamp_column": "ts"}
+    ]))
+    feed = Settings().csv_feeds[0]
+    assert (feed.name, feed.id_column, feed.retention_days) == ("prices", "row", 90)
+
+
+def test_config_declared_feed_runs_through_the_shared_pipeline(db_session, prices_feed):
+    assert "prices" in sources.file_source_names()
+    etl_runner.run_for_source(db_session, "prices")
+
+    raw = db_session.query(models.RawRecord).order_by(models.RawRecord.external_id).all()
+    assert [(r.source, r.external_id, r.payload["title"]) for r in raw] == [("prices", 1, "Gold"), ("prices", 2, "Silver")]
+    unified = {r.external_id: (r.source, r.value) for r in db_session.query(models.UnifiedRecord)}
+    assert unified == {"1": ("prices", 1900), "2": ("prices", 24)}
+    assert etl_runner.get_checkpoint(db_session, "prices") == 2
+
+    # Another feed's rows in raw_records are left alone by retention.
+    db_session.add(models.RawRecord(source="other", external_id=1, payload={},
+                                    received_at=datetime(2000, 1, 1, tzinfo=timezone.utc)))
+    db_session.commit()
+    future = datetime(2100, 1, 1, tzinfo=timezone.utc)
+    pruned = retention.prune_source(db_session, "prices", now=future, root=prices_feed.path.parent / "archive")
+    assert pruned.archived == 2
+    assert [r.source for r in db_session.query(models.RawRecord)] == ["other"]
+
+
+def test_duplicate_unknown_and_incomplete_sources_are_rejected():
+    with pytest.raises(ValueError):
+        sources.register(sources.ApiSource())
+    with pytest.raises(ValueError):
+        sources.get_source("nope")
+
+    class RowsOnly(sources.SourcePlugin):
+        name = "rows_only"
+        raw_model = models.RawRecord
+
+        def rows(self, last_external_id, position):
+            return []
+
+    with pytest.raises(TypeError, match="key, transform"):
+        sources.register(RowsOnly())
+    assert "rows_only" not in sources.source_names()
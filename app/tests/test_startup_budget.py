@@ -0,0 +1,67 @@
+"""Import-time budget for the API and ETL entry points.
+
+Each entry point is started in a fresh interpreter under ``-X importtime``.
+The summed cumulative import time must stay within budget (measured at
+roughly 0.65s for each on a developer laptop), and modules that only some
+code paths need must not be imported at all.  Importing the API must not
+read settings either, so it works before API_KEY is set.  Set
+IMPORT_BUDGET_SCALE to loosen the time budgets on slow machines.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+
+
+def _import_profile(*args: str, env: dict[str, str] | None = None) -> tuple[float, set[str], str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=env or {**os.environ, "API_KEY": "test-key"},
+        check=True,
+    )
+    total_us, modules = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        modules.add(name.strip())
+        if not name.startswith("  "):  # top level: nested imports are indented
+            total_us += int(cumulative)
+    return total_us / 1e6, modules, result.stdout
+
+
+def test_api_import_stays_within_budget():
+    seconds, modules, stdout = _import_profile(
+        "-c", "import app.main, app.db.session as s; print(s.get_engine.cache_info().currsize)"
+    )
+    assert seconds < 1.5 * SCALE, f"importing app.main took {seconds:.2f}s"
+    assert stdout.strip() == "0", "importing app.main must not create the database engine"
+    assert not modules & {
+        "httpx", "app.ingestion.api_source", "app.db.migrations", "app.db.async_session",
+        "sqlalchemy.ext.asyncio", "psycopg2", "asyncpg",
+    }
+
+
+def test_etl_runner_import_stays_within_budget():
+    seconds, modules, _ = _import_profile("-m", "app.ingestion.etl_runner", "--help")
+    assert seconds < 1.2 * SCALE, f"starting app.ingestion.etl_runner took {seconds:.2f}s"
+    assert not modules & {"httpx", "app.ingestion.api_source", "app.ingestion.parallel_csv", "concurrent.futures.process"}
+
+
+@pytest.mark.parametrize("module", ["app.main", "app.ingestion.etl_runner"])
+def test_import_does_not_read_settings(module):
+    env = {key: value for key, value in os.environ.items() if key != "API_KEY"}
+    _, _, stdout = _import_profile(
+        "-c", f"import {module}, app.core.config as c; print(c.get_settings.cache_info().currsize)", env=env
+    )
+    assert stdout.strip() == "0", f"importing {module} must not build settings"
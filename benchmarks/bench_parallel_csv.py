@@ -0,0 +1,57 @@
+"""Rows/sec of CSV parsing plus transform, serial versus the process pool.
+
+Writes ``--rows`` rows shaped like CSV source 1 and reads them back through
+the serial ``CsvTail`` + columnar transform and through ``ParallelCsvChunks``
+with each worker count in ``--workers``.  Only parsing is measured; nothing
+is written to a database, so the numbers are the ceiling the single writer
+can be fed at.
+
+    python -m benchmarks.bench_parallel_csv --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def bench(rows: int, workers: list[int], range_bytes: int, chunk_size: int) -> dict[str, float]:
+    from app.ingestion.bulk import chunked
+    from app.ingestion.columnar import transform_columns
+    from app.ingestion.csv_source1 import COLUMNS
+    from app.ingestion.csv_tail import CsvTail
+    from app.ingestion.parallel_csv import ParallelCsvChunks
+    from benchmarks.generators import write_source1_csv
+
+    metrics: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_source1_csv(Path(tmp) / "source1.csv", rows)
+
+        started = time.perf_counter()
+        for batch in chunked(CsvTail(path, COLUMNS.id_column), chunk_size):
+            transform_columns(batch, COLUMNS)
+        metrics["parse.serial.rows_per_second"] = rows / (time.perf_counter() - started)
+
+        for count in workers:
+            started = time.perf_counter()
+            for _ in ParallelCsvChunks(path, COLUMNS, workers=count, range_bytes=range_bytes):
+                pass
+            metrics[f"parse.parallel_{count}.rows_per_second"] = rows / (time.perf_counter() - started)
+    return metrics
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark serial and parallel CSV parsing.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--range-bytes", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("API_KEY", "bench")
+    print(json.dumps(bench(args.rows, args.workers, args.range_bytes, args.chunk_size), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
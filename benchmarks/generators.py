@@ -0,0 +1,66 @@
+"""Synthetic data shaped like the production feeds.
+
+All generators are deterministic for a given size so runs are comparable,
+and stream their output so the 10M-row presets do not need the data in
+memory.
+"""
+import csv
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.stub_coingecko import make_coin
+
+SCALES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+_EPOCH = datetime(2024, 12, 10, 8, 0)
+
+
+def parse_scale(value: str) -> int:
+    key = value.lower()
+    if key in SCALES:
+        return SCALES[key]
+    return int(value)
+
+
+def write_source1_csv(path: Path, rows: int) -> Path:
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "value", "timestamp"])
+        for i in range(1, rows + 1):
+            ts = _EPOCH + timedelta(minutes=15 * (i // 4))
+            writer.writerow([i, f"Coin {i} (C{i})", f"{(i * 37) % 50000 + 0.25:.2f}", ts.isoformat()])
+    return path
+
+
+def write_source2_csv(path: Path, rows: int) -> Path:
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["record_id", "full_name", "score", "created_at"])
+        for i in range(1, rows + 1):
+            ts = _EPOCH + timedelta(minutes=15 * (i // 4))
+            writer.writerow([i, f"Coin {i} Trading Volume (24h)", (i * 7919) % 10_000_000_000, ts.isoformat()])
+    return path
+
+
+class SyntheticCoins(Sequence):
+    """Lazily generated CoinGecko ``/coins/markets`` records."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [make_coin(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return make_coin(index)
@@ -0,0 +1,53 @@
+"""Concurrent HTTP load driver shared by the benchmark scripts."""
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        },
+    }
+
+
+async def run_load(app, paths: Callable[[int], str], requests: int, concurrency: int) -> dict:
+    """Issue ``requests`` GETs against ``app`` (ASGI) with ``concurrency`` in flight."""
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for n in counter:
+                t0 = time.perf_counter()
+                resp = await client.get(paths(n))
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if resp.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
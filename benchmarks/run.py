@@ -0,0 +1,199 @@
+"""Reproducible ETL and API benchmark suite.
+
+Generates ``source1.csv`` / ``source2.csv``-shaped files and serves
+CoinGecko-shaped JSON from a local stub, times ``run_for_source`` for each
+source, then measures ``/data``, ``/stats`` and ``/health`` under concurrent
+load and compares reading the whole dataset through ``/data/export`` with
+paging it through ``/data``.  Results are written as JSON and can be compared against a stored
+baseline; the exit status is 1 when any metric regressed beyond the
+tolerance.
+
+    python -m benchmarks.run --scale 10k --output bench_results.json
+    python -m benchmarks.run --scale 10k --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generators import SyntheticCoins, parse_scale, write_source1_csv, write_source2_csv
+from benchmarks.load import run_load
+
+API_PATHS = {
+    "data_page": lambda n: f"/data?page={n % 20 + 1}&page_size=100",
+    "data_cursor": lambda n: "/data?pagination=cursor&page_size=100",
+    "stats": lambda n: "/stats",
+    "health": lambda n: "/health",
+}
+
+# Metrics whose name ends with one of these suffixes are better when larger.
+HIGHER_IS_BETTER = ("_rps", "_rows_per_second")
+
+
+def bench_etl(workdir: Path, rows: int, api_rows: int, sources: list[str]) -> dict[str, float]:
+    from app.db import models
+    from app.db.migrations import upgrade
+    from app.db.session import SessionLocal, engine
+    from app.ingestion import api_source, csv_source1, csv_source2, etl_runner
+    from benchmarks.stub_coingecko import StubCoinGecko
+
+    upgrade(engine)
+    csv_source1.DATA_PATH = write_source1_csv(workdir / "source1.csv", rows)
+    csv_source2.DATA_PATH = write_source2_csv(workdir / "source2.csv", rows)
+
+    metrics: dict[str, float] = {}
+    with StubCoinGecko(SyntheticCoins(api_rows)) as stub:
+        api_source._fetcher = api_source.CoinGeckoFetcher(url=stub.url)
+        try:
+            for source in sources:
+                with SessionLocal() as db:
+                    started = time.perf_counter()
+                    etl_runner.run_for_source(db, source)
+                    elapsed = time.perf_counter() - started
+                    run = db.query(models.EtlRun).filter_by(source=source).order_by(models.EtlRun.id.desc()).first()
+                    processed = run.records_processed or 0
+                metrics[f"etl.{source}.wall_seconds"] = elapsed
+                metrics[f"etl.{source}.rows_per_second"] = processed / elapsed if elapsed else 0.0
+        finally:
+            api_source._fetcher.close()
+            api_source._fetcher = None
+    return metrics
+
+
+def bench_api(requests: int, concurrency: int) -> dict[str, float]:
+    from app.main import create_app
+
+    app = create_app()
+    metrics: dict[str, float] = {}
+    for name, paths in API_PATHS.items():
+        result = asyncio.run(run_load(app, paths, requests, concurrency))
+        metrics[f"api.{name}.throughput_rps"] = result["throughput_rps"]
+        for pct in ("p50", "p95", "p99"):
+            metrics[f"api.{name}.{pct}_ms"] = result["latency_ms"][pct]
+        metrics[f"api.{name}.errors"] = result["errors"]
+    return metrics
+
+
+async def _read_all(app) -> dict[str, float]:
+    import httpx
+
+    metrics: dict[str, float] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        rows, cursor = 0, None
+        while True:
+            params = {"pagination": "cursor", "page_size": 100, **({"cursor": cursor} if cursor else {})}
+            body = (await client.get("/data", params=params)).json()
+            rows += len(body["data"])
+            cursor = body["pagination"]["next_cursor"]
+            if cursor is None:
+                break
+        elapsed = time.perf_counter() - started
+        metrics["api.data_paging.rows_per_second"] = rows / elapsed if elapsed else 0.0
+
+        for fmt in ("ndjson", "csv"):
+            started = time.perf_counter()
+            request = client.stream(
+                "GET", "/data/export", params={"format": fmt}, headers={"Accept-Encoding": "gzip"}
+            )
+            async with request as resp:
+                lines = 0
+                async for _ in resp.aiter_lines():
+                    lines += 1
+            elapsed = time.perf_counter() - started
+            exported = lines - 1 if fmt == "csv" else lines
+            metrics[f"api.export_{fmt}.rows_per_second"] = exported / elapsed if elapsed else 0.0
+    return metrics
+
+
+def bench_export() -> dict[str, float]:
+    """Rows per second reading every unified record via /data/export versus /data paging."""
+    from app.main import create_app
+
+    return asyncio.run(_read_all(create_app()))
+
+
+def compare(current: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Return a description of every metric that is worse than baseline by more than ``tolerance``."""
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        if name not in current:
+            continue
+        value = current[name]
+        if name.endswith(".errors"):
+            if value > base:
+                regressions.append(f"{name}: {base:g} -> {value:g}")
+            continue
+        if not base:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (base - value) / base
+        else:
+            change = (value - base) / base
+        if change > tolerance:
+            regressions.append(f"{name}: {base:.4g} -> {value:.4g} ({change:+.1%} worse)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the ETL/API benchmark suite.")
+    parser.add_argument("--scale", default="10k", help="Rows per CSV feed: 10k, 1m, 10m or an integer")
+    parser.add_argument("--api-rows", default=None, help="Coins served by the stub API (defaults to --scale)")
+    parser.add_argument("--sources", default="api,csv1,csv2", help="Comma-separated sources to time")
+    parser.add_argument("--database-url", default=None, help="Defaults to a SQLite file in the work dir")
+    parser.add_argument("--workdir", default=None, help="Where generated data and the SQLite file go")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per API endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cache", action="store_true", help="Leave the API response cache enabled")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    rows = parse_scale(args.scale)
+    api_rows = parse_scale(args.api_rows) if args.api_rows else rows
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="etl-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Settings are read once, on first use, so configure them before importing app.
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.setdefault("API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "true" if args.cache else "false"
+
+    metrics = bench_etl(workdir, rows, api_rows, [s for s in args.sources.split(",") if s])
+    metrics.update(bench_api(args.requests, args.concurrency))
+    metrics.update(bench_export())
+
+    results = {
+        "meta": {
+            "scale": rows,
+            "api_rows": api_rows,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": args.cache,
+            "python": platform.python_version(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "metrics": metrics,
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+    print(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(metrics, baseline["metrics"], args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", *regressions, sep="\n  ")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
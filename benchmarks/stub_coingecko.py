@@ -0,0 +1,85 @@
+"""Local HTTP stand-in for CoinGecko's ``/coins/markets`` endpoint, shared by the benchmarks and tests."""
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MARKETS_PATH = "/api/v3/coins/markets"
+
+
+def make_coin(i: int, price: float | None = None) -> dict:
+    ts = datetime(2024, 12, 10, 8, 0) + timedelta(seconds=i)
+    return {
+        "id": f"coin-{i}",
+        "symbol": f"c{i}",
+        "name": f"Coin {i}",
+        "current_price": price if price is not None else float(i + 1),
+        "market_cap": (i + 1) * 1000,
+        "last_updated": ts.isoformat() + ".000Z",
+    }
+
+
+class StubCoinGecko:
+    """Serve ``coins`` paginated like CoinGecko.
+
+    ``throttle`` maps a page number to how many times it should answer 429
+    (with ``Retry-After: 0``) before succeeding.
+    """
+
+    def __init__(self, coins: list[dict], throttle: dict[int, int] | None = None):
+        self.coins = coins
+        self.throttle = Counter(throttle or {})
+        self.hits: Counter = Counter()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{MARKETS_PATH}"
+
+    def __enter__(self) -> "StubCoinGecko":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # keep test output quiet
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path != MARKETS_PATH:
+                    self.send_error(404)
+                    return
+                query = parse_qs(parsed.query)
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", ["100"])[0])
+                with stub.lock:
+                    stub.hits[page] += 1
+                    throttled = stub.throttle[page] > 0
+                    if throttled:
+                        stub.throttle[page] -= 1
+                if throttled:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                start = (page - 1) * per_page
+                body = json.dumps(stub.coins[start:start + per_page]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler